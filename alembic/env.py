@@ -24,14 +24,28 @@ from app.models.cloud_resource import Base
 from app.models.attack import Base
 from app.models.log import Base
 from app.models.resource_metric import Base
+from app.models.resource_metric_rollup import Base
+from app.models.attack_campaign import Base
+from app.models.simulation_job import Base
 
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip schema items declared for other databases only, like the PostgreSQL trigram indexes"""
+    condition = getattr(object, "_ddl_if", None)
+    if condition is None or condition.dialect is None:
+        return True
+    dialects = (condition.dialect,) if isinstance(condition.dialect, str) else condition.dialect
+    return context.get_context().dialect.name in dialects
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -48,7 +62,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
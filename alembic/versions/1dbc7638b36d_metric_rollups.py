@@ -0,0 +1,54 @@
+"""metric rollups
+
+Revision ID: 1dbc7638b36d
+Revises: 862ed94f9d02
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1dbc7638b36d'
+down_revision: Union[str, None] = '862ed94f9d02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRICS = ('cpu_usage', 'memory_usage', 'disk_usage', 'network_usage', 'anomaly_score')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_resource_metrics_resource_id_timestamp', 'resource_metrics', ['resource_id', 'timestamp'], unique=False
+    )
+
+    aggregate_columns = [
+        sa.Column(f'{metric}_{aggregate}', sa.Float(), nullable=False)
+        for metric in METRICS
+        for aggregate in ('min', 'max', 'sum')
+    ]
+    op.create_table(
+        'resource_metric_rollups',
+        sa.Column('resource_id', sa.Integer(), nullable=False),
+        sa.Column('resolution', sa.String(length=2), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False),
+        *aggregate_columns,
+        sa.ForeignKeyConstraint(['resource_id'], ['cloud_resources.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('resource_id', 'resolution', 'bucket_start'),
+    )
+    op.create_index(
+        'ix_resource_metric_rollups_resolution_bucket', 'resource_metric_rollups',
+        ['resolution', 'bucket_start'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_resource_metric_rollups_resolution_bucket', table_name='resource_metric_rollups')
+    op.drop_table('resource_metric_rollups')
+    op.drop_index('ix_resource_metrics_resource_id_timestamp', table_name='resource_metrics')
@@ -0,0 +1,133 @@
+"""initial schema
+
+Revision ID: 44d0cda1e3bb
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '44d0cda1e3bb'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('first_name', sa.String(), nullable=True),
+        sa.Column('last_name', sa.String(), nullable=True),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('role', sa.Enum('admin', 'user', name='userrole'), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('password', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_password'), 'users', ['password'], unique=False)
+
+    op.create_table(
+        'cloud_resources',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('resource_type', sa.Enum('VM', 'STORAGE', 'SERVICE', name='resource_type'), nullable=True),
+        sa.Column('status', sa.Enum(
+            'running', 'stopped', 'provisioning', 'available', 'in_progress',
+            'detected', 'mitigating', 'mitigated', name='status'
+        ), nullable=True),
+        sa.Column('ip_address', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('under_attack', sa.Boolean(), nullable=True),
+        sa.Column('cpu_usage', sa.Float(), nullable=True),
+        sa.Column('memory_usage', sa.Float(), nullable=True),
+        sa.Column('memory_total', sa.Float(), nullable=True),
+        sa.Column('memory_available', sa.Float(), nullable=True),
+        sa.Column('disk_usage', sa.Float(), nullable=True),
+        sa.Column('network_usage', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_cloud_resources_id'), 'cloud_resources', ['id'], unique=False)
+
+    op.create_table(
+        'attacks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resource_id', sa.Integer(), nullable=True),
+        sa.Column('attack_type', sa.Enum(
+            'format_string', 'off_by_one', 'heap_overflow', 'stack_overflow', name='attack_type'
+        ), nullable=False),
+        sa.Column('status', sa.Enum(
+            'running', 'stopped', 'provisioning', 'available', 'in_progress',
+            'detected', 'mitigating', 'mitigated', name='attack_status'
+        ), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('memory_impact', sa.Float(), nullable=True),
+        sa.Column('cpu_impact', sa.Float(), nullable=True),
+        sa.Column('duration', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['resource_id'], ['cloud_resources.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_attacks_id'), 'attacks', ['id'], unique=False)
+
+    op.create_table(
+        'logs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resource_id', sa.Integer(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.Column('level', sa.String(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('process', sa.String(), nullable=True),
+        sa.Column('pid', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['resource_id'], ['cloud_resources.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_logs_id'), 'logs', ['id'], unique=False)
+
+    op.create_table(
+        'resource_metrics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('resource_id', sa.Integer(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.Column('cpu_usage', sa.Float(), nullable=False),
+        sa.Column('memory_usage', sa.Float(), nullable=False),
+        sa.Column('memory_total', sa.Float(), nullable=False),
+        sa.Column('memory_available', sa.Float(), nullable=False),
+        sa.Column('disk_usage', sa.Float(), nullable=False),
+        sa.Column('network_usage', sa.Float(), nullable=False),
+        sa.Column('vulnerability_count', sa.Integer(), nullable=True),
+        sa.Column('attack_count', sa.Integer(), nullable=True),
+        sa.Column('anomaly_score', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['resource_id'], ['cloud_resources.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_resource_metrics_id'), 'resource_metrics', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_resource_metrics_id'), table_name='resource_metrics')
+    op.drop_table('resource_metrics')
+    op.drop_index(op.f('ix_logs_id'), table_name='logs')
+    op.drop_table('logs')
+    op.drop_index(op.f('ix_attacks_id'), table_name='attacks')
+    op.drop_table('attacks')
+    op.drop_index(op.f('ix_cloud_resources_id'), table_name='cloud_resources')
+    op.drop_table('cloud_resources')
+    op.drop_index(op.f('ix_users_password'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    for enum_name in ('attack_status', 'attack_type', 'status', 'resource_type', 'userrole'):
+        sa.Enum(name=enum_name).drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,52 @@
+"""simulation jobs
+
+Revision ID: 5b2e9f0c7a41
+Revises: 1dbc7638b36d
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9f0c7a41'
+down_revision: Union[str, None] = '1dbc7638b36d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'simulation_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attack_id', sa.Integer(), nullable=False),
+        sa.Column('resource_id', sa.Integer(), nullable=False),
+        sa.Column('attack_type', sa.String(length=32), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['attack_id'], ['attacks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_simulation_jobs_id'), 'simulation_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_simulation_jobs_attack_id'), 'simulation_jobs', ['attack_id'], unique=False)
+    op.create_index(
+        'ix_simulation_jobs_status_heartbeat_at', 'simulation_jobs', ['status', 'heartbeat_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_simulation_jobs_status_heartbeat_at', table_name='simulation_jobs')
+    op.drop_index(op.f('ix_simulation_jobs_attack_id'), table_name='simulation_jobs')
+    op.drop_index(op.f('ix_simulation_jobs_id'), table_name='simulation_jobs')
+    op.drop_table('simulation_jobs')
@@ -0,0 +1,31 @@
+"""log pagination indexes
+
+Revision ID: 862ed94f9d02
+Revises: 44d0cda1e3bb
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '862ed94f9d02'
+down_revision: Union[str, None] = '44d0cda1e3bb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Trailing id matches the (timestamp, id) keyset ordering used by GET /api/logs
+    op.create_index('ix_logs_resource_id_timestamp', 'logs', ['resource_id', 'timestamp', 'id'], unique=False)
+    op.create_index('ix_logs_timestamp', 'logs', ['timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_logs_timestamp', table_name='logs')
+    op.drop_index('ix_logs_resource_id_timestamp', table_name='logs')
@@ -0,0 +1,60 @@
+"""attack campaigns
+
+Revision ID: a3c81d6e4f20
+Revises: 5b2e9f0c7a41
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c81d6e4f20'
+down_revision: Union[str, None] = '5b2e9f0c7a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'attack_campaigns',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('attack_type', sa.String(length=32), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_attack_campaigns_id'), 'attack_campaigns', ['id'], unique=False)
+
+    # Batch mode so the foreign keys can be added on SQLite as well
+    with op.batch_alter_table('attacks') as batch_op:
+        batch_op.add_column(sa.Column('campaign_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_attacks_campaign_id', 'attack_campaigns', ['campaign_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index(op.f('ix_attacks_campaign_id'), ['campaign_id'], unique=False)
+
+    with op.batch_alter_table('simulation_jobs') as batch_op:
+        batch_op.add_column(sa.Column('campaign_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_simulation_jobs_campaign_id', 'attack_campaigns', ['campaign_id'], ['id'], ondelete='CASCADE'
+        )
+        batch_op.create_index(op.f('ix_simulation_jobs_campaign_id'), ['campaign_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('simulation_jobs') as batch_op:
+        batch_op.drop_index(op.f('ix_simulation_jobs_campaign_id'))
+        batch_op.drop_constraint('fk_simulation_jobs_campaign_id', type_='foreignkey')
+        batch_op.drop_column('campaign_id')
+    with op.batch_alter_table('attacks') as batch_op:
+        batch_op.drop_index(op.f('ix_attacks_campaign_id'))
+        batch_op.drop_constraint('fk_attacks_campaign_id', type_='foreignkey')
+        batch_op.drop_column('campaign_id')
+    op.drop_index(op.f('ix_attack_campaigns_id'), table_name='attack_campaigns')
+    op.drop_table('attack_campaigns')
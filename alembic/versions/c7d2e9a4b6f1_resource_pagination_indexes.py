@@ -0,0 +1,44 @@
+"""resource pagination indexes
+
+Revision ID: c7d2e9a4b6f1
+Revises: a3c81d6e4f20
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e9a4b6f1'
+down_revision: Union[str, None] = 'a3c81d6e4f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Trailing id matches the (sort column, id) keyset ordering used by GET /api/resources
+    op.create_index('ix_cloud_resources_owner_id_id', 'cloud_resources', ['owner_id', 'id'], unique=False)
+    op.create_index('ix_cloud_resources_name_id', 'cloud_resources', ['name', 'id'], unique=False)
+    op.create_index('ix_cloud_resources_created_at_id', 'cloud_resources', ['created_at', 'id'], unique=False)
+    op.create_index('ix_cloud_resources_cpu_usage_id', 'cloud_resources', ['cpu_usage', 'id'], unique=False)
+    op.create_index('ix_cloud_resources_memory_usage_id', 'cloud_resources', ['memory_usage', 'id'], unique=False)
+    op.create_index('ix_cloud_resources_status_id', 'cloud_resources', ['status', 'id'], unique=False)
+    op.create_index(
+        'ix_cloud_resources_under_attack_id', 'cloud_resources', ['under_attack', 'id'], unique=False,
+        postgresql_where=sa.text('under_attack'), sqlite_where=sa.text('under_attack'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cloud_resources_under_attack_id', table_name='cloud_resources')
+    op.drop_index('ix_cloud_resources_status_id', table_name='cloud_resources')
+    op.drop_index('ix_cloud_resources_memory_usage_id', table_name='cloud_resources')
+    op.drop_index('ix_cloud_resources_cpu_usage_id', table_name='cloud_resources')
+    op.drop_index('ix_cloud_resources_created_at_id', table_name='cloud_resources')
+    op.drop_index('ix_cloud_resources_name_id', table_name='cloud_resources')
+    op.drop_index('ix_cloud_resources_owner_id_id', table_name='cloud_resources')
@@ -0,0 +1,41 @@
+"""user search indexes
+
+Revision ID: e4b8f1c3a925
+Revises: c7d2e9a4b6f1
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8f1c3a925'
+down_revision: Union[str, None] = 'c7d2e9a4b6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ('email', 'first_name', 'last_name')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Other databases search without an index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f'ix_users_{column}_trgm', 'users', [column], unique=False,
+            postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for column in reversed(SEARCH_COLUMNS):
+        op.drop_index(f'ix_users_{column}_trgm', table_name='users')
@@ -1,22 +1,25 @@
-import asyncio
+from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.controller.deps import get_db
+from app.enum.job_kind import JobKind
 from app.enum.status_enum import StatusEnum
+from app.schemas.campaign import CampaignProgress, CampaignRequest
 from app.schemas.cloud_resource_base import SimulateAttackRequest, AttackResponse, AttackCreate
 from app.services.attack_service import AttackService
+from app.services.campaign_service import campaign_service
 from app.services.log_service import LogService
+from app.schemas.simulation_job import SimulationJobResponse
 from app.services.resource_service import ResourceService
-from app.utils.websocket_manager import ConnectionManager
+from app.services.simulation_scheduler import simulation_scheduler
 
 router = APIRouter()
 
 resource_service = ResourceService()
 attack_service = AttackService()
 log_service = LogService()
-manager = ConnectionManager()
 
 
 @router.post("/attacks/simulate", response_model=AttackResponse)
@@ -24,7 +27,7 @@ async def simulate_attack(
         request: SimulateAttackRequest, db: AsyncSession = Depends(get_db)
 ):
     # Get the resource
-    resource = await resource_service.get_resource(db, request.resource_id)
+    resource = await resource_service.get_resource_snapshot(db, request.resource_id)
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
 
@@ -35,24 +38,56 @@ async def simulate_attack(
             resource_id=request.resource_id,
             attack_type=request.attack_type,
             status=StatusEnum.in_progress,
-            details=f"Simulating {request.attack_type} attack on {resource.name}"
+            details=f"Simulating {request.attack_type.value} attack on {resource.name}"
         )
     )
 
     # Log the attack
     await log_service.create_log(
-        db,
         resource_id=request.resource_id,
         level="warning",
-        message=f"Attack simulation started: {request.attack_type}",
-        process="attack-simulator"
+        message=f"Attack simulation started: {request.attack_type.value}",
+        process="attack-simulator",
+        wait=False,
     )
 
-    # Simulate the attack (async)
-    asyncio.create_task(
-        attack_service.simulate_attack(
-            db, attack.id, resource.id, request.attack_type, manager
-        )
+    # Simulate the attack in the background
+    await simulation_scheduler.submit(
+        db, JobKind.attack, attack.id, resource.id, request.attack_type
     )
 
     return attack
+
+
+@router.post("/attacks/campaigns", response_model=CampaignProgress)
+async def start_campaign(request: CampaignRequest, db: AsyncSession = Depends(get_db)):
+    try:
+        campaign = await campaign_service.create_campaign(db, request)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="No resources match the selector")
+    return campaign
+
+
+@router.get("/attacks/campaigns/{campaign_id}", response_model=CampaignProgress)
+async def get_campaign(campaign_id: int, db: AsyncSession = Depends(get_db)):
+    campaign = await campaign_service.get_progress(db, campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
+
+@router.get("/attacks/{attack_id}/jobs", response_model=List[SimulationJobResponse])
+async def get_attack_jobs(attack_id: int, db: AsyncSession = Depends(get_db)):
+    return await simulation_scheduler.get_attack_jobs(db, attack_id)
+
+
+@router.post("/attacks/{attack_id}/cancel", response_model=List[SimulationJobResponse])
+async def cancel_attack(attack_id: int, db: AsyncSession = Depends(get_db)):
+    attack = await attack_service.get_attack(db, attack_id)
+    if not attack:
+        raise HTTPException(status_code=404, detail="Attack not found")
+
+    # Stop the simulation and any countermeasure still running for it
+    return await simulation_scheduler.cancel_attack_jobs(db, attack_id)
@@ -1,19 +1,66 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, NamedTuple, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.controller.deps import get_db
+from app.enum.export_format import ExportFormat
 from app.schemas.cloud_resource_base import LogResponse
+from app.services.export_service import ExportService, MEDIA_TYPES
 from app.services.log_service import LogService
+from app.utils.clock import as_naive_utc
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 log_service = LogService()
+export_service = ExportService()
 router = APIRouter()
 
+
+class TimeRange(NamedTuple):
+    start: Optional[datetime]
+    end: Optional[datetime]
+
+
+def log_time_range(
+    start: Optional[datetime] = Query(None, description="Only logs at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only logs before this time"),
+) -> TimeRange:
+    """The start and end query parameters as naive UTC, like Log.timestamp"""
+    return TimeRange(as_naive_utc(start), as_naive_utc(end))
+
+
 @router.get("/logs/", response_model=List[LogResponse])
 async def get_logs(
+    response: Response,
     resource_id: Optional[int] = None,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    level: Optional[List[str]] = Query(None, description="Filter by level; repeat for several"),
+    process: Optional[str] = None,
+    time_range: TimeRange = Depends(log_time_range),
     db: AsyncSession = Depends(get_db),
 ):
-    return await log_service.get_logs(db, resource_id, limit)
+    try:
+        logs, next_cursor = await log_service.get_logs(
+            db, resource_id, limit, cursor, level, process, time_range.start, time_range.end
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return logs
+
+
+@router.get("/logs/export")
+async def export_logs(
+    format: ExportFormat = ExportFormat.ndjson,
+    resource_id: Optional[int] = None,
+    time_range: TimeRange = Depends(log_time_range),
+):
+    return StreamingResponse(
+        export_service.stream_logs(format, resource_id, time_range.start, time_range.end),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="logs.{format.value}"'},
+    )
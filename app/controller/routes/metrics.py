@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.controller.deps import get_db
+from app.enum.export_format import ExportFormat
+from app.schemas.metrics import MetricBatch, MetricIngestResponse, MetricSample, MetricSeries
+from app.services.export_service import ExportService, MEDIA_TYPES
+from app.services.metrics_service import MetricsService
+from app.utils.clock import as_naive_utc
+
+router = APIRouter()
+
+export_service = ExportService()
+metrics_service = MetricsService()
+
+
+@router.post("/metrics/samples", response_model=MetricIngestResponse)
+async def ingest_samples(samples: List[MetricSample], db: AsyncSession = Depends(get_db)):
+    rows = [sample.model_dump() for sample in samples]
+    for row in rows:
+        row["timestamp"] = as_naive_utc(row["timestamp"])
+    missing = await metrics_service.unknown_resources(db, [row["resource_id"] for row in rows])
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Unknown resource ids: {missing[:10]}")
+    ingested = await metrics_service.ingest(db, rows)
+    return {"ingested": ingested}
+
+
+@router.post("/metrics/batch", response_model=MetricIngestResponse)
+async def ingest_batch(batch: MetricBatch, db: AsyncSession = Depends(get_db)):
+    columns = batch.model_dump()
+    if columns["timestamp"] is not None:
+        columns["timestamp"] = [as_naive_utc(timestamp) for timestamp in columns["timestamp"]]
+    try:
+        ingested, updated = await metrics_service.ingest_batch(db, columns)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return {"ingested": ingested, "resources_updated": updated}
+
+
+@router.get("/metrics/resources/{resource_id}", response_model=MetricSeries)
+async def get_resource_metrics(
+    resource_id: int,
+    start: Optional[datetime] = Query(None, description="Defaults to one hour before end"),
+    end: Optional[datetime] = Query(None, description="Defaults to now"),
+    step: Optional[float] = Query(None, ge=0, description="Wanted seconds between points; 0 for raw samples"),
+    db: AsyncSession = Depends(get_db),
+):
+    end = as_naive_utc(end) or datetime.utcnow()
+    start = as_naive_utc(start) or end - timedelta(hours=1)
+    if start >= end:
+        raise HTTPException(status_code=422, detail="start must be before end")
+    resolution, points = await metrics_service.query_range(db, resource_id, start, end, step)
+    return {"resource_id": resource_id, "resolution": resolution, "points": points}
+
+
+@router.get("/metrics/export")
+async def export_metrics(
+    format: ExportFormat = ExportFormat.ndjson,
+    resource_id: Optional[int] = None,
+    start: Optional[datetime] = Query(None, description="Only samples at or after this time"),
+    end: Optional[datetime] = Query(None, description="Only samples before this time"),
+):
+    return StreamingResponse(
+        export_service.stream_metrics(format, resource_id, as_naive_utc(start), as_naive_utc(end)),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="metrics.{format.value}"'},
+    )
@@ -1,12 +1,17 @@
 import logging
-from typing import List
+from typing import List, Optional
 
-from fastapi import Depends, HTTPException, APIRouter
+from fastapi import Depends, HTTPException, APIRouter, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.controller.deps import get_db
+from app.enum.resource_sort import ResourceSort
+from app.enum.resource_type import ResourceType
+from app.enum.sort_order import SortOrder
+from app.enum.status_enum import StatusEnum
 from app.schemas.cloud_resource_base import CloudResourceResponse, CloudResourceCreate
 from app.services.resource_service import ResourceService
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
 
 logging.basicConfig(
     level=logging.INFO,
@@ -25,13 +30,38 @@ async def create_resource(
 
 
 @router.get("/resources/", response_model=List[CloudResourceResponse])
-async def get_resources(db: AsyncSession = Depends(get_db)):
-    return await resource_service.get_resources(db)
+async def get_resources(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header from the previous page"),
+    sort: ResourceSort = ResourceSort.id,
+    order: SortOrder = SortOrder.asc,
+    owner_id: Optional[int] = None,
+    resource_type: Optional[ResourceType] = None,
+    status: Optional[StatusEnum] = None,
+    under_attack: Optional[bool] = None,
+    min_cpu: Optional[float] = Query(None, description="Only resources at or above this CPU %"),
+    max_cpu: Optional[float] = Query(None, description="Only resources at or below this CPU %"),
+    min_memory: Optional[float] = Query(None, description="Only resources using at least this many GB"),
+    max_memory: Optional[float] = Query(None, description="Only resources using at most this many GB"),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        resources, next_cursor, total = await resource_service.get_resources(
+            db, limit, cursor, sort, order, owner_id, resource_type, status,
+            under_attack, min_cpu, max_cpu, min_memory, max_memory,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return resources
 
 
 @router.get("/resources/{resource_id}", response_model=CloudResourceResponse)
 async def get_resource(resource_id: int, db: AsyncSession = Depends(get_db)):
-    resource = await resource_service.get_resource(db, resource_id)
+    resource = await resource_service.get_resource_snapshot(db, resource_id)
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
     return resource
@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+
+from app.core.pool import pool_metrics
+from app.services.anomaly_service import anomaly_service
+from app.services.log_writer import log_writer
+from app.services.resource_cache import resource_cache
+from app.services.simulation_scheduler import simulation_scheduler
+from app.services.user_service import principal_cache
+from app.utils.event_bus import event_bus
+from app.utils.jwt import token_cache
+from app.utils.security import password_hasher
+from app.utils.websocket_manager import manager
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_stats():
+    return {
+        "log_writer": log_writer.stats(),
+        "websocket": manager.stats(),
+        "event_bus": event_bus.stats(),
+        "anomaly_scoring": anomaly_service.stats(),
+        "simulations": simulation_scheduler.stats(),
+        "resource_cache": resource_cache.stats(),
+        "password_hashing": password_hasher.stats(),
+        "db_pool": pool_metrics.stats(),
+        "auth": {"tokens": token_cache.stats(), "principals": principal_cache.stats()},
+    }
@@ -3,22 +3,41 @@ from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.enum.user_role import UserRole
-from app.services.user_service import UserService
+from app.services.user_service import Principal, UserService
 from app.utils.jwt import create_access_token
-from app.utils.security import verify_password
+from app.utils.security import PasswordHasherBusy, password_hasher
 from fastapi import APIRouter, Depends, Query
-from app.schemas.user import UserCreate, UserOut, LoginUser, UserResponse, UserWithResources
-from app.controller.deps import get_db
+from app.schemas.user import CurrentUser, UserCreate, UserOut, LoginUser, UserResponse, UserWithResources
+from app.controller.deps import get_current_user, get_db
 from fastapi import HTTPException, status
 
 router = APIRouter()
 user_service = UserService()
 
+
+def hasher_busy() -> HTTPException:
+    """Response for when the password hashing pool is saturated"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/login")
 async def login(form_data: LoginUser, db: AsyncSession = Depends(get_db)):
-    user = await user_service.get_user_by_email(db, email=form_data.email)
-    if not user or not verify_password(form_data.password, user.password):
+    user = await user_service.get_login_credentials(db, email=form_data.email)
+    # Hand the connection back to the pool while bcrypt runs
+    await db.rollback()
+    try:
+        valid = user is not None and await password_hasher.verify(form_data.password, user.password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
+    # Checked after the password so the answer does not reveal deactivated accounts to guessers
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
     token = create_access_token(data={"sub": str(user.id)})
     return {"access_token": token, "token_type": "bearer"}
 
@@ -29,7 +48,10 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    new_user = await user_service.create_user(db=db, user_data=user)
+    try:
+        new_user = await user_service.create_user(db=db, user_data=user)
+    except PasswordHasherBusy:
+        raise hasher_busy()
     return new_user
 
 
@@ -42,7 +64,10 @@ async def create_user(
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    return await user_service.create_user(db, user)
+    try:
+        return await user_service.create_user(db, user)
+    except PasswordHasherBusy:
+        raise hasher_busy()
 
 
 @router.get("/users/", response_model=List[UserWithResources])
@@ -50,6 +75,11 @@ async def get_users(db: AsyncSession = Depends(get_db)):
     return await user_service.get_users(db)
 
 
+@router.get("/users/me", response_model=CurrentUser)
+async def get_me(current_user: Principal = Depends(get_current_user)):
+    return current_user
+
+
 @router.get("/users/{user_id}", response_model=UserWithResources)
 async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
     user = await user_service.get_user(db, user_id)
@@ -63,9 +93,11 @@ async def search_users(
         query: str = Query(..., description="Search query"),
         role: Optional[UserRole] = Query(None, description="Filter by role"),
         is_active: Optional[bool] = Query(None, description="Filter by active status"),
+        limit: int = Query(20, ge=1, le=100),
+        offset: int = Query(0, ge=0, le=10000),
         db: AsyncSession = Depends(get_db)
 ):
-    return await user_service.search_users(db, query, role, is_active)
+    return await user_service.search_users(db, query, role, is_active, limit, offset)
 
 
 @router.put("/users/{user_id}/role", response_model=UserResponse)
@@ -1,16 +1,46 @@
+import orjson
 from fastapi import APIRouter
 from starlette.websockets import WebSocket, WebSocketDisconnect
 
-from app.utils.websocket_manager import ConnectionManager
+from app.utils.websocket_manager import manager
 
 router = APIRouter()
-manager = ConnectionManager()
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, binary: bool = False):
+    # ?binary=true delivers the same orjson payloads as binary frames
+    await manager.connect(websocket, binary)
     try:
         while True:
             data = await websocket.receive_text()
-    except WebSocketDisconnect:
+            await handle_client_message(websocket, data)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the hub already closed the socket (slow consumer or failed send)
+        pass
+    finally:
         manager.disconnect(websocket)
+
+
+async def handle_client_message(websocket: WebSocket, data: str):
+    """Handle subscription requests such as
+    {"action": "subscribe", "topics": ["resource:12", "log:level>=warning"]}
+    """
+    try:
+        message = orjson.loads(data)
+        action = message.get("action")
+        topics = message.get("topics", [])
+        if action not in ("subscribe", "unsubscribe") or not isinstance(topics, list):
+            raise ValueError("Expected {\"action\": \"subscribe\"|\"unsubscribe\", \"topics\": [...]}")
+        if action == "subscribe":
+            current = manager.subscribe(websocket, topics)
+        else:
+            current = manager.unsubscribe(websocket, topics)
+    except (orjson.JSONDecodeError, AttributeError, TypeError, ValueError) as exc:
+        await manager.send_personal_message(
+            orjson.dumps({"type": "error", "payload": {"detail": str(exc)}}), websocket
+        )
+        return
+
+    await manager.send_personal_message(
+        orjson.dumps({"type": "subscriptions", "payload": {"topics": current}}), websocket
+    )
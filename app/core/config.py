@@ -1,8 +1,93 @@
+from datetime import datetime
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
 
+    # Connection pool (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced; -1 keeps them
+    DB_POOL_PRE_PING: bool = True
+    DB_SLOW_HOLD_THRESHOLD: float = 5.0  # seconds a connection may stay checked out before it is logged
+
+    # Buffered log writer
+    LOG_BUFFER_MAX_BATCH: int = 500
+    LOG_BUFFER_FLUSH_INTERVAL: float = 0.05  # seconds
+    LOG_BUFFER_MAX_PENDING: int = 10000
+
+    # WebSocket hub
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest"  # or "disconnect"
+
+    # Cross-worker event bus: "memory", "postgres" or "unix"
+    EVENT_BUS_BACKEND: str = "memory"
+    EVENT_BUS_CHANNEL: str = "cloud_processor_events"
+    EVENT_BUS_SOCKET_DIR: str = "/tmp/cloud-processor-bus"
+
+    # Rows fetched per server-side cursor round trip when exporting
+    EXPORT_CHUNK_SIZE: int = 2000
+
+    # Metric storage; a retention of 0 days keeps data forever
+    METRICS_RAW_RETENTION_DAYS: int = 2
+    METRICS_1M_RETENTION_DAYS: int = 14
+    METRICS_1H_RETENTION_DAYS: int = 180
+    METRICS_1D_RETENTION_DAYS: int = 0
+    METRICS_RETENTION_INTERVAL: float = 3600  # seconds
+    METRICS_MAX_POINTS: int = 500
+    METRICS_MAX_BATCH: int = 50000
+
+    # Anomaly scoring
+    ANOMALY_TICK_INTERVAL: float = 10  # seconds
+    ANOMALY_WINDOW: int = 30  # samples per resource, newest included
+    ANOMALY_LOOKBACK_MINUTES: int = 60
+    ANOMALY_MIN_SAMPLES: int = 5
+    ANOMALY_MIN_STD: float = 0.5
+    ANOMALY_EWMA_ALPHA: float = 0.3
+    ANOMALY_ALERT_THRESHOLD: float = 3.0
+
+    # Simulation scheduler
+    SIMULATION_MAX_CONCURRENCY: int = 200  # running jobs per worker
+    SIMULATION_HEARTBEAT_INTERVAL: float = 5  # seconds
+    SIMULATION_STALE_AFTER: float = 30  # seconds without heartbeat before a job is resumed elsewhere
+
+    # Attack campaigns
+    CAMPAIGN_MAX_RESOURCES: int = 5000
+    CAMPAIGN_PROGRESS_INTERVAL: float = 1.0  # seconds between progress broadcasts per campaign
+
+    # Simulated impact model; changing the salt reshuffles every baseline
+    IMPACT_MODEL_SALT: str = ""
+
+    # Directory of attack scenario YAML files; defaults to the bundled app/scenarios
+    SCENARIO_DIR: Optional[str] = None
+
+    # Simulation clock: real, scaled (CLOCK_SCALE times faster) or virtual (no waiting)
+    CLOCK_MODE: str = "real"
+    CLOCK_SCALE: float = 100.0
+    CLOCK_VIRTUAL_START: Optional[datetime] = None  # fixed start makes virtual timestamps reproducible
+    CLOCK_VIRTUAL_SEED: int = 0  # seeds the simulated process ids of each virtual timeline
+
+    # Password hashing pool; callers beyond PASSWORD_HASH_MAX_PENDING get 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Authentication caches; a role change or deactivation reaches other workers over the event bus
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    AUTH_PRINCIPAL_CACHE_TTL: float = 60.0  # seconds
+
+    # Resource list: X-Total-Count is a planner estimate at or above this many rows
+    RESOURCE_EXACT_COUNT_BELOW: int = 1000
+
+    # Resource lookup cache; with bus invalidation other workers drop changed entries at once,
+    # otherwise they serve them until the TTL runs out
+    RESOURCE_CACHE_TTL: float = 5.0  # seconds
+    RESOURCE_CACHE_MAX_SIZE: int = 10000
+    RESOURCE_CACHE_BUS_INVALIDATION: bool = True
+
     class Config:
         env_file = ".env"
 
@@ -1,15 +1,91 @@
 import os
+from typing import Optional
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.pool import InstrumentedPool
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async drivers used by the application; alembic keeps using the sync URL as-is
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "postgres": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    # Read the driver off the name: resolving the dialect fails for the "postgres" alias
+    if driver is None or parsed.drivername.partition("+")[2] == driver:
+        return url
+    if backend == "postgres":
+        backend = "postgresql"
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+# Created on first use so importing the app touches neither the driver nor the database;
+# the schema itself is managed by alembic alone
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def pool_options(url: str) -> dict:
+    """Pool arguments from settings; in-memory SQLite keeps its single shared connection"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def get_engine() -> AsyncEngine:
+    """The application engine, created on first call"""
+    global _engine
+    if _engine is None:
+        url = to_async_url(DATABASE_URL)
+        _engine = create_async_engine(url, **pool_options(url))
+    return _engine
+
+
+def get_sessionmaker() -> async_sessionmaker:
+    """Session factory bound to the application engine"""
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(
+            bind=get_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _sessionmaker
+
+
+def new_session() -> AsyncSession:
+    """New session from the application session factory"""
+    return get_sessionmaker()()
+
+
+async def dispose_engine():
+    """Close every pooled connection; the next get_engine() starts a fresh engine"""
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _sessionmaker = None
+
 
 Base = declarative_base()
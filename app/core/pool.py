@@ -0,0 +1,93 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# What the current task is doing with the database, e.g. "GET /api/logs/logs/"
+session_origin: ContextVar[str] = ContextVar("session_origin", default="background")
+
+
+class PoolMetrics:
+    """Checkout waits, overflow and long-held connections of the application pool"""
+
+    def __init__(self, slow_hold: float):
+        self.slow_hold = slow_hold
+        self.pool: Optional[AsyncAdaptedQueuePool] = None
+        self.checkouts = 0
+        self.overflow_connections = 0
+        self.timeouts = 0
+        self.slow_holds = 0
+        self.max_wait = 0.0
+        self.max_hold = 0.0
+        self._total_wait = 0.0
+
+    def record_wait(self, wait: float, overflow: bool):
+        self.checkouts += 1
+        if overflow:
+            self.overflow_connections += 1
+        self._total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        return {
+            "size": pool.size() if pool is not None else None,
+            "checked_out": pool.checkedout() if pool is not None else None,
+            "overflow": max(pool.overflow(), 0) if pool is not None else None,
+            "checkouts": self.checkouts,
+            "overflow_connections": self.overflow_connections,
+            "timeouts": self.timeouts,
+            "avg_wait": self._total_wait / self.checkouts if self.checkouts else 0.0,
+            "max_wait": self.max_wait,
+            "slow_holds": self.slow_holds,
+            "max_hold": self.max_hold,
+        }
+
+    def record_hold(self, held: float, origin: str):
+        self.max_hold = max(self.max_hold, held)
+        if held > self.slow_hold:
+            self.slow_holds += 1
+            logger.warning("Database connection held for %.2fs by %s", held, origin)
+
+
+pool_metrics = PoolMetrics(settings.DB_SLOW_HOLD_THRESHOLD)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that reports checkout waits and hold times to pool_metrics
+
+    The task checking a connection out is remembered through session_origin.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # dispose() replaces the pool with a new instance; report on the live one
+        pool_metrics.pool = self
+
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow = self.overflow()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        checked_out_at = time.perf_counter()
+        # The overflow count only grows when a connection beyond pool_size is opened
+        pool_metrics.record_wait(checked_out_at - started, self.overflow() > max(overflow, 0))
+        entry.info["checked_out_at"] = checked_out_at
+        entry.info["origin"] = session_origin.get()
+        return entry
+
+    def _do_return_conn(self, record):
+        checked_out_at = record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            pool_metrics.record_hold(time.perf_counter() - checked_out_at, record.info.pop("origin", None))
+        super()._do_return_conn(record)
@@ -1,7 +1,17 @@
 import enum
+from typing import Union
 
 class AttackType(str, enum.Enum):
     format_string = "format-string"
     off_by_one = "off-by-one"
     heap_overflow = "heap-overflow"
     stack_overflow = "stack-overflow"
+
+
+def attack_type_value(attack_type: Union[AttackType, str]) -> str:
+    """The plain value of an attack type, e.g. "heap-overflow"
+
+    Use it for dictionary and cache keys: AttackType members hash by name,
+    so they miss entries keyed by value.
+    """
+    return getattr(attack_type, "value", attack_type)
@@ -0,0 +1,5 @@
+import enum
+
+class ExportFormat(str, enum.Enum):
+    ndjson = "ndjson"
+    csv = "csv"
@@ -0,0 +1,6 @@
+import enum
+
+
+class JobKind(str, enum.Enum):
+    attack = "attack"
+    countermeasure = "countermeasure"
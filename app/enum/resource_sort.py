@@ -0,0 +1,9 @@
+import enum
+
+
+class ResourceSort(str, enum.Enum):
+    id = "id"
+    name = "name"
+    created_at = "created_at"
+    cpu_usage = "cpu_usage"
+    memory_usage = "memory_usage"
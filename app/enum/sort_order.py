@@ -0,0 +1,6 @@
+import enum
+
+
+class SortOrder(str, enum.Enum):
+    asc = "asc"
+    desc = "desc"
@@ -1,11 +1,42 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
-from app.controller.routes import user, websocket, resources, logs, attacks, countermeasures
-from app.core.database import Base, engine
+from app.controller.routes import user, websocket, resources, logs, attacks, countermeasures, stats, metrics
+from app.core.database import dispose_engine, get_engine
+from app.services.anomaly_service import anomaly_service
+from app.services.log_writer import log_writer
+from app.services.metrics_service import MetricsService
+from app.services.simulation_scheduler import simulation_scheduler
+from app.utils.event_bus import event_bus
+from app.utils.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.utils.security import password_hasher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is managed by `alembic upgrade head`; connections open on first use
+    get_engine()
+    await event_bus.start()
+    await simulation_scheduler.start()
+    retention_task = asyncio.create_task(MetricsService().retention_loop())
+    scoring_task = asyncio.create_task(anomaly_service.scoring_loop())
+    yield
+    scoring_task.cancel()
+    retention_task.cancel()
+    # Let them unwind before the connections they may be using go away
+    await asyncio.gather(scoring_task, retention_task, return_exceptions=True)
+    await simulation_scheduler.close()
+    password_hasher.close()
+    await event_bus.close()
+    # Flush buffered logs before the engine goes away
+    await log_writer.close()
+    await dispose_engine()
+
 
-Base.metadata.create_all(bind=engine)
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,6 +44,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the pagination headers
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
 app.include_router(user.router, prefix="/api/users", tags=["users"])
@@ -23,3 +56,5 @@ app.include_router(resources.router, prefix="/api/resources", tags=["resources"]
 app.include_router(logs.router, prefix="/api/logs", tags=["logs"])
 app.include_router(attacks.router, prefix="/api/attacks", tags=["attacks"])
 app.include_router(countermeasures.router, prefix="/api/countermeasures", tags=["countermeasures"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
+app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
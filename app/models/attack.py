@@ -8,6 +8,7 @@ from app.core.database import Base
 from app.enum.attack_type import AttackType
 from app.enum.status_enum import StatusEnum
 from app.models.user import Base
+from app.models.attack_campaign import Base
 
 
 class Attack(Base):
@@ -23,5 +24,7 @@ class Attack(Base):
     memory_impact = Column(Float, default=0.0)  # Memory consumption increase in GB
     cpu_impact = Column(Float, default=0.0)     # CPU usage increase in %
     duration = Column(Integer, default=0)       # Attack duration in seconds
+    campaign_id = Column(Integer, ForeignKey("attack_campaigns.id", ondelete="SET NULL"), nullable=True, index=True)
 
     resource = relationship("CloudResource", back_populates="attacks")
+    campaign = relationship("AttackCampaign", back_populates="attacks")
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+
+class AttackCampaign(Base):
+    """One attack type simulated against a set of resources at once"""
+
+    __tablename__ = "attack_campaigns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    attack_type = Column(String(32), nullable=False)
+    total = Column(Integer, nullable=False)  # resources the campaign targets
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    attacks = relationship("Attack", back_populates="campaign", passive_deletes=True)
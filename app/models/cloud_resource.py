@@ -1,6 +1,6 @@
 from datetime import datetime
 from sqlalchemy import (
-    Boolean, Column, DateTime, Enum, Integer, String, Float, ForeignKey
+    Boolean, Column, DateTime, Enum, Index, Integer, String, Float, ForeignKey, text
 )
 from sqlalchemy.orm import relationship
 
@@ -12,6 +12,20 @@ from app.models.attack import Base
 
 class CloudResource(Base):
     __tablename__ = "cloud_resources"
+    __table_args__ = (
+        # Keyset pagination walks (sort column, id) for every sort of GET /api/resources
+        Index("ix_cloud_resources_owner_id_id", "owner_id", "id"),
+        Index("ix_cloud_resources_name_id", "name", "id"),
+        Index("ix_cloud_resources_created_at_id", "created_at", "id"),
+        Index("ix_cloud_resources_cpu_usage_id", "cpu_usage", "id"),
+        Index("ix_cloud_resources_memory_usage_id", "memory_usage", "id"),
+        Index("ix_cloud_resources_status_id", "status", "id"),
+        # Few resources are under attack at any time
+        Index(
+            "ix_cloud_resources_under_attack_id", "under_attack", "id",
+            postgresql_where=text("under_attack"), sqlite_where=text("under_attack"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -34,3 +48,6 @@ class CloudResource(Base):
     logs = relationship("Log", back_populates="resource", cascade="all, delete-orphan")
     attacks = relationship("Attack", back_populates="resource", cascade="all, delete-orphan")
     metrics = relationship("ResourceMetric", back_populates="resource", cascade="all, delete-orphan")
+    metric_rollups = relationship(
+        "ResourceMetricRollup", back_populates="resource", cascade="all, delete-orphan", passive_deletes=True
+    )
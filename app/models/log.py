@@ -1,6 +1,6 @@
 from datetime import datetime
 from sqlalchemy import (
-    Column, DateTime, ForeignKey, Integer, String, Text
+    Column, DateTime, ForeignKey, Index, Integer, String, Text
 )
 from sqlalchemy.orm import relationship
 
@@ -18,3 +18,9 @@ class Log(Base):
     process = Column(String, nullable=True)
     pid = Column(Integer, nullable=True)
     resource = relationship("CloudResource", back_populates="logs")
+
+    __table_args__ = (
+        # Keyset pagination walks (timestamp, id) newest first
+        Index("ix_logs_resource_id_timestamp", "resource_id", "timestamp", "id"),
+        Index("ix_logs_timestamp", "timestamp", "id"),
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -28,3 +28,7 @@ class ResourceMetric(Base):
 
     # Relationships
     resource = relationship("CloudResource", back_populates="metrics")
+
+    __table_args__ = (
+        Index("ix_resource_metrics_resource_id_timestamp", "resource_id", "timestamp"),
+    )
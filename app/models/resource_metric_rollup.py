@@ -0,0 +1,42 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+
+# Metrics aggregated into every rollup bucket
+ROLLUP_METRICS = ("cpu_usage", "memory_usage", "disk_usage", "network_usage", "anomaly_score")
+
+
+class ResourceMetricRollup(Base):
+    """Per-resource time bucket of ResourceMetric samples at 1m, 1h or 1d resolution"""
+
+    __tablename__ = "resource_metric_rollups"
+
+    resource_id = Column(Integer, ForeignKey("cloud_resources.id", ondelete="CASCADE"), primary_key=True)
+    resolution = Column(String(2), primary_key=True)  # 1m, 1h, 1d
+    bucket_start = Column(DateTime, primary_key=True)
+    sample_count = Column(Integer, nullable=False, default=0)
+
+    # min / max / sum per metric; avg is sum / sample_count
+    cpu_usage_min = Column(Float, nullable=False)
+    cpu_usage_max = Column(Float, nullable=False)
+    cpu_usage_sum = Column(Float, nullable=False)
+    memory_usage_min = Column(Float, nullable=False)
+    memory_usage_max = Column(Float, nullable=False)
+    memory_usage_sum = Column(Float, nullable=False)
+    disk_usage_min = Column(Float, nullable=False)
+    disk_usage_max = Column(Float, nullable=False)
+    disk_usage_sum = Column(Float, nullable=False)
+    network_usage_min = Column(Float, nullable=False)
+    network_usage_max = Column(Float, nullable=False)
+    network_usage_sum = Column(Float, nullable=False)
+    anomaly_score_min = Column(Float, nullable=False)
+    anomaly_score_max = Column(Float, nullable=False)
+    anomaly_score_sum = Column(Float, nullable=False)
+
+    resource = relationship("CloudResource", back_populates="metric_rollups")
+
+    __table_args__ = (
+        # Retention deletes whole resolutions by age
+        Index("ix_resource_metric_rollups_resolution_bucket", "resolution", "bucket_start"),
+    )
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+
+from app.core.database import Base
+
+
+class SimulationJob(Base):
+    """A queued or running attack simulation or countermeasure deployment"""
+
+    __tablename__ = "simulation_jobs"
+    __table_args__ = (
+        # The scheduler claims work by status, oldest heartbeat first
+        Index("ix_simulation_jobs_status_heartbeat_at", "status", "heartbeat_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(16), nullable=False)  # JobKind
+    status = Column(String(16), nullable=False)  # JobStatus
+    attack_id = Column(Integer, ForeignKey("attacks.id", ondelete="CASCADE"), nullable=False, index=True)
+    resource_id = Column(Integer, nullable=False)
+    attack_type = Column(String(32), nullable=False)
+    campaign_id = Column(Integer, ForeignKey("attack_campaigns.id", ondelete="CASCADE"), nullable=True, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
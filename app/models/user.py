@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, Boolean
+from sqlalchemy import DDL, Column, Integer, String, Enum, Boolean, Index, event
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -16,3 +16,21 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     password = Column(String, nullable=False, index=True)
     resources = relationship("CloudResource", back_populates="owner", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Trigram indexes serve the ILIKE '%q%' matches of user search; PostgreSQL only,
+        # and alembic/env.py keeps autogenerate from expecting them on other databases
+        *(
+            Index(
+                f"ix_users_{column}_trgm", column,
+                postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+            for column in ("email", "first_name", "last_name")
+        ),
+    )
+
+
+event.listen(
+    User.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
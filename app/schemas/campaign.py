@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.enum.attack_type import AttackType
+from app.enum.resource_type import ResourceType
+
+
+class CampaignRequest(BaseModel):
+    """Selector criteria are combined; at least one is required"""
+    attack_type: AttackType
+    resource_ids: Optional[List[int]] = None
+    resource_type: Optional[ResourceType] = None
+    owner_id: Optional[int] = None
+
+
+class CampaignProgress(BaseModel):
+    id: int
+    attack_type: str
+    total: int
+    created_at: datetime
+    pending: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    done: bool = False
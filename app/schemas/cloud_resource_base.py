@@ -32,10 +32,17 @@ class LogBase(BaseModel):
 class LogCreate(LogBase):
     pass
 
+class ResourceRef(BaseModel):
+    id: int
+    name: str
+
+    class Config:
+        from_attributes = True
+
 class LogResponse(LogBase):
     id: int
     timestamp: datetime
-    resource: CloudResourceResponse
+    resource: Optional[ResourceRef] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class MetricSample(BaseModel):
+    resource_id: int
+    timestamp: Optional[datetime] = None
+    cpu_usage: float
+    memory_usage: float
+    memory_total: float
+    memory_available: Optional[float] = None
+    disk_usage: float
+    network_usage: float
+    anomaly_score: float = 0.0
+
+
+class MetricBatch(BaseModel):
+    """Columnar samples: entry i of every list belongs to the same sample"""
+    resource_id: List[int]
+    timestamp: Optional[List[datetime]] = None
+    cpu_usage: List[float]
+    memory_usage: List[float]
+    memory_total: Optional[List[float]] = None  # defaults to the resource's memory_total
+    disk_usage: List[float]
+    network_usage: List[float]
+    anomaly_score: Optional[List[float]] = None
+
+
+class MetricIngestResponse(BaseModel):
+    ingested: int
+    resources_updated: int = 0
+
+
+class MetricAggregate(BaseModel):
+    min: float
+    max: float
+    avg: float
+
+
+class MetricPoint(BaseModel):
+    timestamp: datetime
+    sample_count: int
+    cpu_usage: MetricAggregate
+    memory_usage: MetricAggregate
+    disk_usage: MetricAggregate
+    network_usage: MetricAggregate
+    anomaly_score: MetricAggregate
+
+
+class MetricSeries(BaseModel):
+    resource_id: int
+    resolution: str  # raw, 1m, 1h or 1d
+    points: List[MetricPoint]
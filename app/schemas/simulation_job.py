@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.enum.job_kind import JobKind
+from app.enum.job_status import JobStatus
+
+
+class SimulationJobResponse(BaseModel):
+    id: int
+    kind: JobKind
+    status: JobStatus
+    attack_id: int
+    resource_id: int
+    attack_type: str
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -22,6 +22,15 @@ class UserOut(UserCreate):
     class Config:
         from_attributes = True
 
+class CurrentUser(BaseModel):
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
 class UserBase(BaseModel):
     username: str
     email: str
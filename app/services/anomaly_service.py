@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import new_session
+from app.models.cloud_resource import CloudResource
+from app.models.resource_metric import ResourceMetric
+from app.models.resource_metric_rollup import ResourceMetricRollup
+from app.services.metrics_service import RESOLUTIONS, bucket_start
+from app.utils.websocket_manager import ConnectionManager, manager
+
+logger = logging.getLogger(__name__)
+
+# Metrics the score is computed from
+SCORED_METRICS = ("cpu_usage", "memory_usage", "network_usage")
+
+# Postgres advisory lock so only one worker scores per tick
+SCORING_LOCK_KEY = 7_310_021
+
+
+class AnomalyService:
+    """Scores every new sample of every resource against the samples before it
+
+    Each worker remembers per resource the newest sample it scored and
+    whether that sample was above the alert threshold. A resource it has
+    not scored before (after a restart, or when other workers took the
+    earlier ticks) gets only its newest sample scored, judged against the
+    stored scores of the two newest samples.
+    """
+
+    def __init__(self, broadcaster: Optional[ConnectionManager] = None):
+        self.manager = broadcaster or manager
+        self.ticks = 0
+        self.resources_scored = 0
+        self.alerts_raised = 0
+        self.last_tick_duration = 0.0
+        # resource id -> (newest sample id scored, whether it was above the threshold)
+        self._state: Dict[int, Tuple[int, bool]] = {}
+
+    async def score_tick(self, db: AsyncSession, now: Optional[datetime] = None) -> int:
+        """Score the unscored samples of all resources in one pass; returns how many resources had any"""
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+
+        if db.bind.dialect.name == "postgresql":
+            locked = await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": SCORING_LOCK_KEY})
+            if not locked:
+                return 0
+
+        window = await self._load_windows(db, now)
+        if window is None:
+            await db.commit()
+            return 0
+        resource_ids, sample_ids, sample_times, values, stored_scores = window
+
+        # Candidate samples are the newest ANOMALY_WINDOW, each scored against the window ending at it
+        width = settings.ANOMALY_WINDOW
+        candidates = sample_ids[:, width - 1:]
+        rows, columns = np.nonzero(self._pending(resource_ids, candidates))
+        if not rows.size:
+            await db.commit()
+            self.ticks += 1
+            return 0
+        windows = sliding_window_view(values, width, axis=1)[rows, columns].transpose(0, 2, 1)
+
+        scores = self.compute_scores(windows)
+        scored_ids = candidates[rows, columns]
+        await self._write_scores(
+            db, resource_ids[rows], scored_ids, sample_times, scores, stored_scores[:, width - 1:][rows, columns]
+        )
+        await db.commit()
+
+        # Alert once, when a resource crosses the threshold
+        crossed = self._track_alerts(resource_ids, rows, scored_ids, scores, stored_scores)
+        if crossed.size:
+            await self._raise_alerts(db, resource_ids[rows[crossed]], scored_ids[crossed], scores[crossed], now)
+
+        scored_resources = len(np.unique(rows))
+        self.ticks += 1
+        self.resources_scored += scored_resources
+        self.last_tick_duration = time.perf_counter() - started
+        return scored_resources
+
+    def compute_scores(self, values: np.ndarray) -> np.ndarray:
+        """Anomaly score per window from a (windows, window length, metrics) array
+
+        The last sample of each window is compared with the samples before it,
+        both as a z-score against their mean and as a deviation from their
+        EWMA, in units of their standard deviation. Missing samples are NaN.
+        The score is the largest of these over all metrics.
+        """
+        history = values[:, :-1, :]
+        latest = values[:, -1, :]
+        present = ~np.isnan(history)
+        counts = present.sum(axis=1)
+        filled = np.where(present, history, 0.0)
+
+        safe_counts = np.maximum(counts, 1)
+        mean = filled.sum(axis=1) / safe_counts
+        variance = (np.where(present, history - mean[:, None, :], 0.0) ** 2).sum(axis=1) / safe_counts
+        std = np.maximum(np.sqrt(variance), settings.ANOMALY_MIN_STD)
+
+        # Newest history sample gets weight alpha, the one before alpha * (1 - alpha), ...
+        alpha = settings.ANOMALY_EWMA_ALPHA
+        ages = np.arange(history.shape[1] - 1, -1, -1)
+        weights = np.where(present, (alpha * (1 - alpha) ** ages)[None, :, None], 0.0)
+        ewma = (weights * filled).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-12)
+
+        z_score = np.abs(latest - mean) / std
+        ewma_deviation = np.abs(latest - ewma) / std
+        scores = np.maximum(z_score, ewma_deviation).max(axis=1)
+
+        # Too little history to say anything
+        scores[counts.min(axis=1) < settings.ANOMALY_MIN_SAMPLES] = 0.0
+        return np.nan_to_num(scores)
+
+    async def scoring_loop(self):
+        """Run score_tick every ANOMALY_TICK_INTERVAL seconds"""
+        while True:
+            try:
+                async with new_session() as session:
+                    await self.score_tick(session)
+            except Exception:
+                logger.exception("Anomaly scoring tick failed")
+            await asyncio.sleep(settings.ANOMALY_TICK_INTERVAL)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ticks": self.ticks,
+            "resources_scored": self.resources_scored,
+            "alerts_raised": self.alerts_raised,
+            "last_tick_duration_ms": self.last_tick_duration * 1000,
+        }
+
+    async def _load_windows(self, db: AsyncSession, now: datetime):
+        # Enough of the newest samples per resource to give each of the newest
+        # ANOMALY_WINDOW a full window, fetched for every resource at once
+        width = settings.ANOMALY_WINDOW
+        depth = 2 * width - 1
+        rank = func.row_number().over(
+            partition_by=ResourceMetric.resource_id,
+            order_by=(ResourceMetric.timestamp.desc(), ResourceMetric.id.desc()),
+        ).label("rank")
+        ranked = (
+            select(
+                ResourceMetric.id, ResourceMetric.resource_id, ResourceMetric.timestamp,
+                ResourceMetric.anomaly_score,
+                *[getattr(ResourceMetric, metric) for metric in SCORED_METRICS], rank,
+            )
+            .where(ResourceMetric.timestamp >= now - timedelta(minutes=settings.ANOMALY_LOOKBACK_MINUTES))
+            .subquery()
+        )
+        rows = (await db.execute(select(ranked).where(ranked.c.rank <= depth))).all()
+        if not rows:
+            return None
+
+        data = np.array(
+            [(row.resource_id, row.id, row.rank, row.anomaly_score or 0.0,
+              *[getattr(row, metric) for metric in SCORED_METRICS]) for row in rows],
+            dtype=np.float64,
+        )
+        resource_ids, resource_index = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+        slots = depth - data[:, 2].astype(np.int64)
+
+        # Newest sample sits in the last slot; missing samples are NaN with id 0
+        values = np.full((len(resource_ids), depth, len(SCORED_METRICS)), np.nan)
+        values[resource_index, slots, :] = data[:, 4:]
+        sample_ids = np.zeros((len(resource_ids), depth), dtype=np.int64)
+        sample_ids[resource_index, slots] = data[:, 1].astype(np.int64)
+        stored_scores = np.zeros((len(resource_ids), depth))
+        stored_scores[resource_index, slots] = data[:, 3]
+        sample_times = {row.id: row.timestamp for row in rows}
+        return resource_ids, sample_ids, sample_times, values, stored_scores
+
+    def _pending(self, resource_ids: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Mask of the candidate samples this worker has not scored yet"""
+        scored_through = np.array(
+            [self._state.get(resource_id, (-1, False))[0] for resource_id in resource_ids.tolist()],
+            dtype=np.int64,
+        )
+        pending = (candidates > 0) & (candidates > scored_through[:, None])
+        # Other workers may have scored the older samples of resources seen here for the first time
+        pending[scored_through < 0, :-1] = False
+        return pending
+
+    def _track_alerts(
+            self,
+            resource_ids: np.ndarray,
+            rows: np.ndarray,
+            sample_ids: np.ndarray,
+            scores: np.ndarray,
+            stored_scores: np.ndarray,
+    ) -> np.ndarray:
+        """Indexes of the scored samples at which a resource crosses the threshold
+
+        Scored samples are grouped by resource, oldest first. Also records
+        where each resource now stands for the next tick.
+        """
+        threshold = settings.ANOMALY_ALERT_THRESHOLD
+        above = scores >= threshold
+        first = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+
+        was_above = np.r_[False, above[:-1]]
+        was_above[first] = [
+            self._state[resource_id][1] if resource_id in self._state
+            else bool((stored_scores[row, -2:] >= threshold).any())
+            for row, resource_id in zip(rows[first].tolist(), resource_ids[rows[first]].tolist())
+        ]
+        last = np.r_[first[1:] - 1, len(rows) - 1]
+        for resource_id, sample_id, alerting in zip(
+                resource_ids[rows[first]].tolist(), np.maximum.reduceat(sample_ids, first).tolist(),
+                above[last].tolist(),
+        ):
+            self._state[resource_id] = (sample_id, alerting)
+        return np.flatnonzero(above & ~was_above)
+
+    async def _write_scores(
+            self,
+            db: AsyncSession,
+            resource_ids: np.ndarray,
+            sample_ids: np.ndarray,
+            sample_times: Dict[int, datetime],
+            scores: np.ndarray,
+            current_scores: np.ndarray,
+    ):
+        await db.execute(
+            update(ResourceMetric),
+            [{"id": sample_id, "anomaly_score": score} for sample_id, score in zip(sample_ids.tolist(), scores.tolist())],
+        )
+
+        # Keep the rollups in step: add the change in score to every bucket of the sample
+        greatest = func.greatest if db.bind.dialect.name == "postgresql" else func.max
+        rollup_updates: List[dict] = []
+        for resource_id, sample_id, score, delta in zip(
+                resource_ids.tolist(), sample_ids.tolist(), scores.tolist(), (scores - current_scores).tolist()
+        ):
+            if delta == 0.0:
+                continue
+            for resolution in RESOLUTIONS:
+                rollup_updates.append({
+                    "b_resource_id": resource_id,
+                    "b_resolution": resolution,
+                    "b_bucket_start": bucket_start(sample_times[sample_id], resolution),
+                    "b_delta": delta,
+                    "b_score": score,
+                })
+        if rollup_updates:
+            rollups = ResourceMetricRollup.__table__
+            await db.execute(
+                update(rollups)
+                .where(rollups.c.resource_id == bindparam("b_resource_id"))
+                .where(rollups.c.resolution == bindparam("b_resolution"))
+                .where(rollups.c.bucket_start == bindparam("b_bucket_start"))
+                .values(
+                    anomaly_score_sum=rollups.c.anomaly_score_sum + bindparam("b_delta"),
+                    anomaly_score_max=greatest(rollups.c.anomaly_score_max, bindparam("b_score")),
+                ),
+                rollup_updates,
+            )
+
+    async def _raise_alerts(
+            self,
+            db: AsyncSession,
+            resource_ids: np.ndarray,
+            sample_ids: np.ndarray,
+            scores: np.ndarray,
+            now: datetime,
+    ):
+        names = dict((await db.execute(
+            select(CloudResource.id, CloudResource.name).where(CloudResource.id.in_(resource_ids.tolist()))
+        )).all())
+        for resource_id, sample_id, score in zip(resource_ids.tolist(), sample_ids.tolist(), scores.tolist()):
+            self.alerts_raised += 1
+            # Same shape as AttackLifecycle.transition so dashboards treat it as an attack
+            await self.manager.broadcast_attack({
+                "id": f"anomaly-{sample_id}",
+                "timestamp": now,
+                "resourceId": str(resource_id),
+                "resourceName": names.get(resource_id),
+                "attackType": "anomaly",
+                "status": "detected",
+                "details": f"Anomalous resource metrics detected (score {score:.2f})",
+            })
+
+
+# Shared so the scoring loop and the stats endpoint see the same counters
+anomaly_service = AnomalyService()
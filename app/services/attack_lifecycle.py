@@ -0,0 +1,108 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.enum.status_enum import StatusEnum
+from app.models.attack import Attack
+from app.models.cloud_resource import CloudResource
+from app.models.log import Log
+from app.services.resource_cache import ResourceCache, resource_cache
+from app.utils.clock import Clock, clock as default_clock
+
+# Allowed source states for every target state of an attack:
+#   in_progress -> detected -> mitigating -> mitigated
+#   in_progress ------------> mitigating
+#   in_progress | detected | mitigating -> stopped (cancelled)
+# Re-entering in_progress or mitigating lets a resumed job replay its start.
+TRANSITIONS: Dict[StatusEnum, Tuple[StatusEnum, ...]] = {
+    StatusEnum.in_progress: (StatusEnum.in_progress,),
+    StatusEnum.detected: (StatusEnum.in_progress,),
+    StatusEnum.mitigating: (StatusEnum.in_progress, StatusEnum.detected, StatusEnum.mitigating),
+    StatusEnum.mitigated: (StatusEnum.mitigating,),
+    StatusEnum.stopped: (StatusEnum.in_progress, StatusEnum.detected, StatusEnum.mitigating),
+}
+
+
+class AttackLifecycle:
+    """Moves attacks between states, one transaction per transition
+
+    A transition is a conditional ``UPDATE attacks ... RETURNING``, so an
+    attack that is not in an allowed source state is left alone and the
+    caller gets None back. The resource flag and any log lines of the
+    transition are written in the same transaction.
+    """
+
+    def __init__(self, clock: Optional[Clock] = None, cache: Optional[ResourceCache] = None):
+        self.clock = clock or default_clock
+        self.cache = cache or resource_cache
+
+    async def transition(
+            self,
+            db: AsyncSession,
+            attack_id: int,
+            target: StatusEnum,
+            under_attack: Optional[bool] = None,
+            details: Optional[str] = None,
+            logs: Sequence[Tuple[str, str, str]] = (),
+    ) -> Optional[Dict[str, Any]]:
+        """Apply a transition and return the attack as broadcast, or None if not allowed
+
+        ``logs`` holds (level, message, process) lines for the attack's resource.
+        """
+        now = self.clock.now()
+        values = {"status": target, "updated_at": now}
+        if details is not None:
+            values["details"] = details
+
+        resource_name = (
+            select(CloudResource.name)
+            .where(CloudResource.id == Attack.resource_id)
+            .scalar_subquery()
+        )
+        row = (await db.execute(
+            update(Attack)
+            .where(Attack.id == attack_id)
+            .where(Attack.status.in_(TRANSITIONS[target]))
+            .values(**values)
+            .returning(
+                Attack.id, Attack.resource_id, Attack.attack_type, Attack.status,
+                Attack.details, Attack.created_at, resource_name.label("resource_name"),
+            )
+        )).first()
+        if row is None:
+            # Nothing changed; end the transaction without expiring the caller's objects
+            await db.commit()
+            return None
+
+        if under_attack is not None:
+            await db.execute(
+                update(CloudResource)
+                .where(CloudResource.id == row.resource_id)
+                .values(under_attack=under_attack)
+            )
+        if logs:
+            await db.execute(insert(Log), [
+                {
+                    "resource_id": row.resource_id,
+                    "timestamp": now,
+                    "level": level,
+                    "message": message,
+                    "process": process,
+                    "pid": self.clock.rng().randint(1000, 9999),
+                }
+                for level, message, process in logs
+            ])
+        await db.commit()
+        if under_attack is not None:
+            await self.cache.invalidate(row.resource_id)
+
+        return {
+            "id": str(row.id),
+            "timestamp": row.created_at,
+            "resourceId": str(row.resource_id),
+            "resourceName": row.resource_name,
+            "attackType": row.attack_type,
+            "status": row.status,
+            "details": row.details,
+        }
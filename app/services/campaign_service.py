@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import new_session
+from app.enum.job_kind import JobKind
+from app.enum.job_status import JobStatus
+from app.enum.status_enum import StatusEnum
+from app.models.attack import Attack
+from app.models.attack_campaign import AttackCampaign
+from app.models.cloud_resource import CloudResource
+from app.models.log import Log
+from app.models.simulation_job import SimulationJob
+from app.schemas.campaign import CampaignRequest
+from app.services.simulation_scheduler import SimulationScheduler, simulation_scheduler
+from app.utils.clock import Clock, clock as default_clock
+from app.utils.websocket_manager import ConnectionManager, manager
+
+logger = logging.getLogger(__name__)
+
+
+class CampaignService:
+    """Simulates one attack type against every resource matching a selector
+
+    Attacks, their first log lines and their simulation jobs are written
+    with one INSERT each; the scheduler then works through the jobs.
+    Progress is broadcast on campaign:{id}, at most once per
+    CAMPAIGN_PROGRESS_INTERVAL per campaign.
+    """
+
+    def __init__(
+            self,
+            scheduler: Optional[SimulationScheduler] = None,
+            broadcaster: Optional[ConnectionManager] = None,
+            clock: Optional[Clock] = None,
+    ):
+        self.scheduler = scheduler or simulation_scheduler
+        self.manager = broadcaster or manager
+        self.clock = clock or default_clock
+        self._scheduled: Set[int] = set()
+        self._report_tasks: Set[asyncio.Task] = set()
+        self.scheduler.add_listener(self._on_job_finished)
+
+    async def create_campaign(self, db: AsyncSession, request: CampaignRequest) -> Optional[Dict[str, Any]]:
+        """Start a campaign; returns None when no resource matches
+
+        Raises ValueError for an empty selector or one matching more than
+        CAMPAIGN_MAX_RESOURCES resources.
+        """
+        if request.resource_ids is None and request.resource_type is None and request.owner_id is None:
+            raise ValueError("Select resources by resource_ids, resource_type or owner_id")
+
+        query = select(CloudResource.id, CloudResource.name).order_by(CloudResource.id)
+        if request.resource_ids is not None:
+            query = query.where(CloudResource.id.in_(request.resource_ids))
+        if request.resource_type is not None:
+            query = query.where(CloudResource.resource_type == request.resource_type)
+        if request.owner_id is not None:
+            query = query.where(CloudResource.owner_id == request.owner_id)
+        resources = (await db.execute(query.limit(settings.CAMPAIGN_MAX_RESOURCES + 1))).all()
+        if not resources:
+            return None
+        if len(resources) > settings.CAMPAIGN_MAX_RESOURCES:
+            raise ValueError(f"Selector matches more than {settings.CAMPAIGN_MAX_RESOURCES} resources")
+
+        attack_type = request.attack_type
+        now = self.clock.now()
+        campaign = AttackCampaign(attack_type=attack_type.value, total=len(resources), created_at=now)
+        db.add(campaign)
+        await db.flush()
+
+        attack_rows = (await db.execute(
+            insert(Attack).returning(Attack.id, Attack.resource_id, sort_by_parameter_order=True),
+            [
+                {
+                    "resource_id": resource.id,
+                    "attack_type": attack_type,
+                    "status": StatusEnum.in_progress,
+                    "details": f"Simulating {attack_type.value} attack on {resource.name}",
+                    "campaign_id": campaign.id,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for resource in resources
+            ],
+        )).all()
+
+        await db.execute(insert(Log), [
+            {
+                "resource_id": resource.id,
+                "timestamp": now,
+                "level": "warning",
+                "message": f"Attack simulation started: {attack_type.value}",
+                "process": "attack-simulator",
+                "pid": self.clock.rng().randint(1000, 9999),
+            }
+            for resource in resources
+        ])
+
+        # Commits the campaign, attacks and logs together with the jobs
+        await self.scheduler.submit_many(
+            db, JobKind.attack, [(row.id, row.resource_id) for row in attack_rows], attack_type, campaign.id
+        )
+
+        progress = self._progress(campaign, {JobStatus.pending.value: len(attack_rows)})
+        await self.manager.broadcast_campaign(progress)
+        return progress
+
+    async def get_progress(self, db: AsyncSession, campaign_id: int) -> Optional[Dict[str, Any]]:
+        """Job counts per status for a campaign"""
+        campaign = await db.get(AttackCampaign, campaign_id)
+        if campaign is None:
+            return None
+        counts = dict((await db.execute(
+            select(SimulationJob.status, func.count())
+            .where(SimulationJob.campaign_id == campaign_id)
+            .where(SimulationJob.kind == JobKind.attack.value)
+            .group_by(SimulationJob.status)
+        )).all())
+        return self._progress(campaign, counts)
+
+    def _progress(self, campaign: AttackCampaign, counts: Dict[str, int]) -> Dict[str, Any]:
+        progress = {
+            "id": campaign.id,
+            "attack_type": campaign.attack_type,
+            "total": campaign.total,
+            "created_at": campaign.created_at,
+        }
+        for status in JobStatus:
+            progress[status.value] = counts.get(status.value, 0)
+        progress["done"] = progress[JobStatus.pending.value] + progress[JobStatus.running.value] == 0
+        return progress
+
+    def _on_job_finished(self, job: SimulationJob, status: JobStatus):
+        if job.campaign_id is None or job.campaign_id in self._scheduled:
+            return
+        # Coalesce: one report covers every job finishing within the interval
+        self._scheduled.add(job.campaign_id)
+        task = asyncio.get_running_loop().create_task(self._report_later(job.campaign_id))
+        self._report_tasks.add(task)
+        task.add_done_callback(self._report_tasks.discard)
+
+    async def _report_later(self, campaign_id: int):
+        await asyncio.sleep(settings.CAMPAIGN_PROGRESS_INTERVAL)
+        self._scheduled.discard(campaign_id)
+        try:
+            async with new_session() as session:
+                progress = await self.get_progress(session, campaign_id)
+            if progress is not None:
+                await self.manager.broadcast_campaign(progress)
+        except Exception:
+            logger.exception("Failed to report progress of campaign %s", campaign_id)
+
+
+campaign_service = CampaignService()
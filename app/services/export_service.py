@@ -0,0 +1,97 @@
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+import orjson
+from sqlalchemy import Select, select
+
+from app.core.config import settings
+from app.core.database import new_session
+from app.enum.export_format import ExportFormat
+from app.models.log import Log
+from app.models.resource_metric import ResourceMetric
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+class ExportService:
+    """Streams full table history without materializing it in memory"""
+
+    LOG_COLUMNS = [
+        Log.id, Log.resource_id, Log.timestamp, Log.level, Log.message, Log.process, Log.pid,
+    ]
+    METRIC_COLUMNS = [
+        ResourceMetric.id, ResourceMetric.resource_id, ResourceMetric.timestamp,
+        ResourceMetric.cpu_usage, ResourceMetric.memory_usage, ResourceMetric.memory_total,
+        ResourceMetric.memory_available, ResourceMetric.disk_usage, ResourceMetric.network_usage,
+        ResourceMetric.vulnerability_count, ResourceMetric.attack_count, ResourceMetric.anomaly_score,
+    ]
+
+    def stream_logs(
+            self,
+            export_format: ExportFormat,
+            resource_id: Optional[int] = None,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream logs oldest first as NDJSON or CSV chunks"""
+        query = select(*self.LOG_COLUMNS).order_by(Log.timestamp, Log.id)
+        query = self._filter(query, Log, resource_id, start, end)
+        return self._stream(query, export_format)
+
+    def stream_metrics(
+            self,
+            export_format: ExportFormat,
+            resource_id: Optional[int] = None,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream resource metric samples oldest first as NDJSON or CSV chunks"""
+        query = select(*self.METRIC_COLUMNS).order_by(ResourceMetric.timestamp, ResourceMetric.id)
+        query = self._filter(query, ResourceMetric, resource_id, start, end)
+        return self._stream(query, export_format)
+
+    def _filter(self, query: Select, model, resource_id, start, end) -> Select:
+        if resource_id:
+            query = query.where(model.resource_id == resource_id)
+        if start:
+            query = query.where(model.timestamp >= start)
+        if end:
+            query = query.where(model.timestamp < end)
+        return query
+
+    async def _stream(self, query: Select, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        # The request session is closed before a streaming body is sent,
+        # so the export holds its own session for as long as it runs
+        async with new_session() as session:
+            result = await session.stream(
+                query.execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+            )
+            columns = list(result.keys())
+            if export_format == ExportFormat.csv:
+                yield self._csv_chunk([columns])
+
+            # Server-side cursor: only one partition is held in memory at a time
+            async for partition in result.partitions():
+                if export_format == ExportFormat.csv:
+                    yield self._csv_chunk(
+                        [[self._csv_value(value) for value in row] for row in partition]
+                    )
+                else:
+                    yield b"".join(
+                        orjson.dumps(dict(zip(columns, row))) + b"\n" for row in partition
+                    )
+
+    def _csv_chunk(self, rows: List[list]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    def _csv_value(self, value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
@@ -0,0 +1,84 @@
+import hashlib
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+from app.core.config import settings
+from app.enum.attack_type import AttackType, attack_type_value
+
+
+class Baseline(NamedTuple):
+    cpu_usage: float  # %
+    memory_usage: float  # GB
+    disk_usage: float  # %
+    network_usage: float  # Mbps
+
+
+class Impact(NamedTuple):
+    memory: float  # GB
+    cpu: float  # %
+
+
+# (offset, spread) pairs; the value is offset + seed % spread
+BASELINE_TABLE: Dict[str, Tuple[float, int]] = {
+    "cpu_usage": (5.0, 10),  # 5-15%
+    "memory_usage": (1.0, 3),  # 1-4GB
+    "disk_usage": (10.0, 20),  # 10-30%
+    "network_usage": (50.0, 100),  # 50-150 Mbps
+}
+
+# Per attack type: (memory offset, memory spread), (cpu offset, cpu spread)
+IMPACT_TABLE: Dict[str, Tuple[Tuple[float, int], Tuple[float, int]]] = {
+    AttackType.heap_overflow.value: ((2.0, 3), (15.0, 10)),  # 2-5GB memory leak, 15-25% CPU spike
+    AttackType.stack_overflow.value: ((1.5, 2), (20.0, 15)),  # 1.5-3.5GB, 20-35% CPU spike
+    AttackType.format_string.value: ((0.5, 1), (10.0, 10)),  # 0.5-1.5GB, 10-20% CPU spike
+    AttackType.off_by_one.value: ((0.3, 1), (8.0, 7)),  # 0.3-1.3GB, 8-15% CPU spike
+}
+
+NO_IMPACT = Impact(memory=0.0, cpu=0.0)
+
+
+def stable_hash(key: str, salt: str = "") -> int:
+    """64-bit hash of a string that is the same in every process, unlike hash()"""
+    digest = hashlib.blake2b(key.encode(), digest_size=8, person=salt.encode()[:16]).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _pick(seed: int, entry: Tuple[float, int]) -> float:
+    offset, spread = entry
+    return offset + seed % spread
+
+
+class ImpactModel:
+    """Baselines and attack impacts derived from a stable per-resource seed
+
+    Results only depend on the resource and the salt, so every worker and
+    every restart agrees on them; they are memoised per instance.
+    """
+
+    def __init__(self, salt: str = "", cache_size: int = 4096):
+        self.salt = salt
+        self.baseline = lru_cache(maxsize=cache_size)(self._baseline)
+        self._cached_impact = lru_cache(maxsize=cache_size)(self._impact)
+
+    def impact(self, resource_id: int, attack_type: str) -> Impact:
+        """Memory and CPU added to a resource by an attack of the given type"""
+        return self._cached_impact(resource_id, attack_type_value(attack_type))
+
+    def seed(self, key: str) -> int:
+        return stable_hash(key, self.salt)
+
+    def _baseline(self, resource_name: str) -> Baseline:
+        """Steady-state usage of a resource, keyed on its name"""
+        seed = self.seed(resource_name)
+        return Baseline(**{metric: _pick(seed, entry) for metric, entry in BASELINE_TABLE.items()})
+
+    def _impact(self, resource_id: int, attack_type: str) -> Impact:
+        entry = IMPACT_TABLE.get(attack_type)
+        if entry is None:
+            return NO_IMPACT
+        seed = self.seed(str(resource_id))
+        memory, cpu = entry
+        return Impact(memory=_pick(seed, memory), cpu=_pick(seed, cpu))
+
+
+impact_model = ImpactModel(settings.IMPACT_MODEL_SALT)
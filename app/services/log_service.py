@@ -1,48 +1,125 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
+from app.models.cloud_resource import CloudResource
 from app.models.log import Log
+from app.services.log_writer import log_writer
+from app.utils.clock import Clock, clock as default_clock
+from app.utils.pagination import decode_timestamp_cursor, encode_cursor
 
 
 class LogService:
+    def __init__(self, clock: Optional[Clock] = None):
+        self.clock = clock or default_clock
+
     async def create_log(
             self,
-            db: AsyncSession,
             resource_id: int,
             level: str,
             message: str,
             process: Optional[str] = None,
             pid: Optional[int] = None,
+            wait: bool = True,
     ) -> Log:
-        """Create a new log entry"""
-        log = Log(
-            resource_id=resource_id,
-            level=level,
-            message=message,
-            process=process,
-            pid=pid if pid else self._generate_random_pid(),
-        )
-        db.add(log)
-        db.commit()
-        db.refresh(log)
-        return log
+        """Create a new log entry through the buffered writer
+
+        The returned Log is not attached to a session. Its id is only set
+        when ``wait`` is true, in which case the call returns after the
+        batch containing it has been committed.
+        """
+        values = {
+            "resource_id": resource_id,
+            "timestamp": self.clock.now(),
+            "level": level,
+            "message": message,
+            "process": process,
+            "pid": pid if pid else self._generate_random_pid(),
+        }
+        log_id = await log_writer.write(values, wait=wait)
+        return Log(id=log_id, **values)
 
     async def get_logs(
-            self, db: AsyncSession, resource_id: Optional[int] = None, limit: int = 100
-    ) -> List[Log]:
-        """Get logs, optionally filtered by resource"""
-        query = select(Log).options(joinedload(Log.resource)).order_by(Log.timestamp.desc()).limit(limit)
+            self,
+            db: AsyncSession,
+            resource_id: Optional[int] = None,
+            limit: int = 100,
+            cursor: Optional[str] = None,
+            levels: Optional[List[str]] = None,
+            process: Optional[str] = None,
+            start: Optional[datetime] = None,
+            end: Optional[datetime] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get a page of logs, newest first, and the cursor for the next page
+
+        Pages are keyed on (timestamp, id) so deep pages cost the same as the
+        first one. Raises ValueError for a malformed cursor.
+        """
+        query = (
+            select(
+                Log.id, Log.resource_id, Log.timestamp, Log.level,
+                Log.message, Log.process, Log.pid,
+                CloudResource.name.label("resource_name"),
+            )
+            .outerjoin(CloudResource, CloudResource.id == Log.resource_id)
+            .order_by(Log.timestamp.desc(), Log.id.desc())
+            # One extra row tells us whether another page exists
+            .limit(limit + 1)
+        )
 
         if resource_id:
             query = query.where(Log.resource_id == resource_id)
+        if levels:
+            query = query.where(Log.level.in_(levels))
+        if process:
+            query = query.where(Log.process == process)
+        if start:
+            query = query.where(Log.timestamp >= start)
+        if end:
+            query = query.where(Log.timestamp < end)
+        if cursor:
+            timestamp, log_id = decode_timestamp_cursor(cursor)
+            query = query.where(tuple_(Log.timestamp, Log.id) < tuple_(timestamp, log_id))
+
+        rows = (await db.execute(query)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+        logs = [
+            {
+                "id": row.id,
+                "resource_id": row.resource_id,
+                "timestamp": row.timestamp,
+                "level": row.level,
+                "message": row.message,
+                "process": row.process,
+                "pid": row.pid,
+                "resource": (
+                    {"id": row.resource_id, "name": row.resource_name}
+                    if row.resource_name is not None else None
+                ),
+            }
+            for row in rows
+        ]
+        return logs, next_cursor
 
-        result = db.execute(query)
-        return result.scalars().all()
+    def log_to_dict(self, log: Log, resource_name: str) -> dict:
+        """Convert Log object to dictionary for WebSocket broadcast"""
+        return {
+            "id": str(log.id),
+            "timestamp": log.timestamp,
+            "resource": resource_name,
+            "resourceId": str(log.resource_id),
+            "level": log.level,
+            "message": log.message,
+            "process": log.process,
+            "pid": log.pid,
+        }
 
     def _generate_random_pid(self) -> int:
         """Generate a random process ID for simulation"""
-        import random
-        return random.randint(1000, 9999)
+        return self.clock.rng().randint(1000, 9999)
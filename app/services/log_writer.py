@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import new_session
+from app.models.log import Log
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class LogWriter:
+    """Collects Log rows in memory and writes them with multi-row INSERTs"""
+
+    def __init__(
+            self,
+            max_batch_size: int = 500,
+            flush_interval: float = 0.05,
+            max_pending: int = 10000,
+    ):
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        # Bounded so producers wait instead of growing memory without limit
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+        self.rows_written = 0
+        self.flush_count = 0
+        self.failed_flushes = 0
+        self.dropped_rows = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self._total_flush_latency = 0.0
+
+    def start(self):
+        """Start the background flush task if it is not running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def write(self, values: Dict[str, Any], wait: bool = True) -> Optional[int]:
+        """Queue a log row; when wait is set, return its id once flushed"""
+        self.start()
+        future = asyncio.get_running_loop().create_future() if wait else None
+        await self._queue.put((values, future))
+        if future is None:
+            return None
+        return await future
+
+    async def close(self):
+        """Flush everything still queued and stop the background task"""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and flush counters"""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "rows_written": self.rows_written,
+            "flush_count": self.flush_count,
+            "failed_flushes": self.failed_flushes,
+            "dropped_rows": self.dropped_rows,
+            "last_flush_latency_ms": self.last_flush_latency * 1000,
+            "max_flush_latency_ms": self.max_flush_latency * 1000,
+            "avg_flush_latency_ms": (
+                self._total_flush_latency / self.flush_count * 1000 if self.flush_count else 0.0
+            ),
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+
+            # Keep collecting until the batch is full or the interval has passed
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]]):
+        started = time.perf_counter()
+        try:
+            try:
+                ids = await self._insert(batch)
+            except Exception:
+                # One retry rides out a dropped connection or a briefly locked table
+                logger.warning("Failed to flush %d log rows, retrying", len(batch), exc_info=True)
+                ids = await self._insert(batch)
+        except Exception as exc:
+            self.failed_flushes += 1
+            self._drop(batch)
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_exception(exc)
+            return
+        except BaseException:
+            # Cancelled mid-flush, e.g. at shutdown
+            self._drop(batch)
+            raise
+        else:
+            latency = time.perf_counter() - started
+            self.rows_written += len(batch)
+            self.flush_count += 1
+            self.last_flush_latency = latency
+            self.max_flush_latency = max(self.max_flush_latency, latency)
+            self._total_flush_latency += latency
+
+            for (_, future), log_id in zip(batch, ids):
+                if future is not None and not future.done():
+                    future.set_result(log_id)
+        finally:
+            # Nobody may be left waiting on a row that was not written
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.cancel()
+
+    async def _insert(self, batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]]) -> List[int]:
+        async with new_session() as session:
+            result = await session.execute(
+                insert(Log).returning(Log.id, sort_by_parameter_order=True),
+                [values for values, _ in batch],
+            )
+            ids = result.scalars().all()
+            await session.commit()
+        return ids
+
+    def _drop(self, batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]]):
+        self.dropped_rows += len(batch)
+        logger.exception("Dropped %d log rows: %r", len(batch), [values for values, _ in batch])
+
+log_writer = LogWriter(
+    max_batch_size=settings.LOG_BUFFER_MAX_BATCH,
+    flush_interval=settings.LOG_BUFFER_FLUSH_INTERVAL,
+    max_pending=settings.LOG_BUFFER_MAX_PENDING,
+)
@@ -0,0 +1,383 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import new_session
+from app.models.cloud_resource import CloudResource
+from app.models.resource_metric import ResourceMetric
+from app.models.resource_metric_rollup import ROLLUP_METRICS, ResourceMetricRollup
+from app.services.resource_cache import resource_cache
+
+logger = logging.getLogger(__name__)
+
+RAW = "raw"
+
+# Rollup resolutions from finest to coarsest
+RESOLUTIONS: Dict[str, timedelta] = {
+    "1m": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+# Accepted range for each metric in a columnar batch
+METRIC_BOUNDS: Dict[str, Tuple[float, float]] = {
+    "cpu_usage": (0.0, 100.0),
+    "memory_usage": (0.0, np.inf),
+    "disk_usage": (0.0, 100.0),
+    "network_usage": (0.0, np.inf),
+    "anomaly_score": (0.0, np.inf),
+}
+
+# Resources per set-based UPDATE of cloud_resources
+LATEST_UPDATE_CHUNK = 500
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """Truncate a timestamp to the start of its rollup bucket"""
+    if resolution == "1m":
+        return timestamp.replace(second=0, microsecond=0)
+    if resolution == "1h":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if resolution == "1d":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown resolution: {resolution}")
+
+
+def retention_for(resolution: str) -> Optional[timedelta]:
+    """How long a resolution is kept; None keeps it forever"""
+    days = {
+        RAW: settings.METRICS_RAW_RETENTION_DAYS,
+        "1m": settings.METRICS_1M_RETENTION_DAYS,
+        "1h": settings.METRICS_1H_RETENTION_DAYS,
+        "1d": settings.METRICS_1D_RETENTION_DAYS,
+    }[resolution]
+    return timedelta(days=days) if days > 0 else None
+
+
+class MetricsService:
+    async def unknown_resources(self, db: AsyncSession, resource_ids: List[int]) -> List[int]:
+        """Ids among resource_ids that have no resource"""
+        wanted = set(resource_ids)
+        if not wanted:
+            return []
+        result = await db.execute(select(CloudResource.id).where(CloudResource.id.in_(wanted)))
+        return sorted(wanted - set(result.scalars().all()))
+
+    async def ingest(self, db: AsyncSession, samples: List[dict]) -> int:
+        """Append raw samples and fold them into the 1m/1h/1d rollups"""
+        if not samples:
+            return 0
+
+        now = datetime.utcnow()
+        rows = []
+        for sample in samples:
+            memory_available = sample.get("memory_available")
+            if memory_available is None:
+                memory_available = sample["memory_total"] - sample["memory_usage"]
+            rows.append({
+                "resource_id": sample["resource_id"],
+                "timestamp": sample.get("timestamp") or now,
+                "cpu_usage": sample["cpu_usage"],
+                "memory_usage": sample["memory_usage"],
+                "memory_total": sample["memory_total"],
+                "memory_available": memory_available,
+                "disk_usage": sample["disk_usage"],
+                "network_usage": sample["network_usage"],
+                "vulnerability_count": sample.get("vulnerability_count", 0),
+                "attack_count": sample.get("attack_count", 0),
+                "anomaly_score": sample.get("anomaly_score", 0.0),
+            })
+
+        await self._append(db, rows)
+        await db.commit()
+        return len(rows)
+
+    async def ingest_batch(self, db: AsyncSession, batch: Dict[str, Optional[list]]) -> Tuple[int, int]:
+        """Validate and store a columnar batch in one transaction
+
+        Samples are appended to resource_metrics and the rollups, and each
+        resource's latest sample is copied onto cloud_resources with one
+        CASE-keyed UPDATE per LATEST_UPDATE_CHUNK resources rather than a
+        single statement, which keeps large batches inside bind parameter
+        limits. Returns (samples stored, resources updated); raises
+        ValueError when the batch is invalid.
+        """
+        size = len(batch["resource_id"])
+        if size == 0:
+            return 0, 0
+        if size > settings.METRICS_MAX_BATCH:
+            raise ValueError(f"Batch of {size} samples exceeds the limit of {settings.METRICS_MAX_BATCH}")
+        for name, entries in batch.items():
+            if entries is not None and len(entries) != size:
+                raise ValueError(f"{name} has {len(entries)} entries, expected {size}")
+
+        resource_ids = np.asarray(batch["resource_id"], dtype=np.int64)
+        columns = {
+            name: np.asarray(batch[name], dtype=np.float64)
+            for name in ("cpu_usage", "memory_usage", "disk_usage", "network_usage")
+        }
+        columns["anomaly_score"] = (
+            np.asarray(batch["anomaly_score"], dtype=np.float64)
+            if batch.get("anomaly_score") is not None else np.zeros(size)
+        )
+        self._validate_columns(columns)
+
+        # One lookup for every distinct resource in the batch
+        unique_ids = np.unique(resource_ids)
+        result = await db.execute(
+            select(CloudResource.id, CloudResource.memory_total)
+            .where(CloudResource.id.in_(unique_ids.tolist()))
+        )
+        totals = dict(result.all())
+        missing = np.setdiff1d(unique_ids, np.fromiter(totals.keys(), dtype=np.int64))
+        if missing.size:
+            raise ValueError(f"Unknown resource ids: {missing[:10].tolist()}")
+
+        if batch.get("memory_total") is not None:
+            memory_total = np.asarray(batch["memory_total"], dtype=np.float64)
+        else:
+            known_ids = np.fromiter(totals.keys(), dtype=np.int64)
+            known_totals = np.array(list(totals.values()), dtype=np.float64)
+            sort = np.argsort(known_ids)
+            memory_total = known_totals[sort][np.searchsorted(known_ids[sort], resource_ids)]
+        over = np.flatnonzero(columns["memory_usage"] > memory_total)
+        if over.size:
+            raise ValueError(f"memory_usage exceeds memory_total at indexes {over[:10].tolist()}")
+        memory_available = memory_total - columns["memory_usage"]
+
+        timestamps = batch.get("timestamp") or [datetime.utcnow()] * size
+        rows = [
+            {
+                "resource_id": resource_id,
+                "timestamp": timestamp,
+                "cpu_usage": cpu,
+                "memory_usage": memory,
+                "memory_total": total,
+                "memory_available": available,
+                "disk_usage": disk,
+                "network_usage": network,
+                "vulnerability_count": 0,
+                "attack_count": 0,
+                "anomaly_score": anomaly,
+            }
+            for resource_id, timestamp, cpu, memory, total, available, disk, network, anomaly in zip(
+                resource_ids.tolist(), timestamps, columns["cpu_usage"].tolist(),
+                columns["memory_usage"].tolist(), memory_total.tolist(), memory_available.tolist(),
+                columns["disk_usage"].tolist(), columns["network_usage"].tolist(),
+                columns["anomaly_score"].tolist(),
+            )
+        ]
+        await self._append(db, rows)
+
+        # Latest sample per resource: sort by (resource, timestamp), keep the end of each run
+        order = np.lexsort((np.array(timestamps, dtype="datetime64[us]"), resource_ids))
+        sorted_ids = resource_ids[order]
+        latest = order[np.append(sorted_ids[1:] != sorted_ids[:-1], True)]
+        await self._update_latest(db, [rows[index] for index in latest.tolist()])
+
+        await db.commit()
+        await resource_cache.invalidate_many(unique_ids.tolist())
+        return size, len(latest)
+
+    async def query_range(
+            self,
+            db: AsyncSession,
+            resource_id: int,
+            start: datetime,
+            end: datetime,
+            step: Optional[float] = None,
+    ) -> Tuple[str, List[dict]]:
+        """Get points for a time range from the finest tier at least step wide
+
+        step is the wanted spacing between points in seconds; 0 asks for raw
+        samples. Without it the range is split into at most
+        METRICS_MAX_POINTS points.
+        """
+        if step is None:
+            step = (end - start).total_seconds() / settings.METRICS_MAX_POINTS
+        resolution = self.pick_resolution(start, step)
+
+        if resolution == RAW:
+            return resolution, await self._query_raw(db, resource_id, start, end)
+        return resolution, await self._query_rollup(db, resource_id, resolution, start, end)
+
+    def pick_resolution(self, start: datetime, step: float, now: Optional[datetime] = None) -> str:
+        """Finest resolution at least as wide as step that still covers start
+
+        Rounding the step up keeps the point count within what the step
+        allows; a step wider than every tier gets the coarsest one.
+        """
+        now = now or datetime.utcnow()
+        tiers = [(RAW, 0.0)] + [(name, width.total_seconds()) for name, width in RESOLUTIONS.items()]
+        chosen = next((index for index, (_, width) in enumerate(tiers) if width >= step), len(tiers) - 1)
+
+        # Finer tiers may already have been pruned for old ranges
+        for name, _ in tiers[chosen:]:
+            retention = retention_for(name)
+            if retention is None or start >= now - retention:
+                return name
+        return tiers[-1][0]
+
+    async def apply_retention(self, db: AsyncSession, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Delete samples and rollups older than their retention period"""
+        now = now or datetime.utcnow()
+        deleted = {}
+
+        retention = retention_for(RAW)
+        if retention is not None:
+            result = await db.execute(
+                delete(ResourceMetric).where(ResourceMetric.timestamp < now - retention)
+            )
+            deleted[RAW] = result.rowcount
+
+        for resolution in RESOLUTIONS:
+            retention = retention_for(resolution)
+            if retention is None:
+                continue
+            result = await db.execute(
+                delete(ResourceMetricRollup)
+                .where(ResourceMetricRollup.resolution == resolution)
+                .where(ResourceMetricRollup.bucket_start < now - retention)
+            )
+            deleted[resolution] = result.rowcount
+
+        await db.commit()
+        return deleted
+
+    async def retention_loop(self):
+        """Apply retention every METRICS_RETENTION_INTERVAL seconds"""
+        while True:
+            try:
+                async with new_session() as session:
+                    deleted = await self.apply_retention(session)
+                logger.info("Metric retention removed %s", deleted)
+            except Exception:
+                logger.exception("Metric retention failed")
+            await asyncio.sleep(settings.METRICS_RETENTION_INTERVAL)
+
+    def _validate_columns(self, columns: Dict[str, np.ndarray]):
+        for name, data in columns.items():
+            low, high = METRIC_BOUNDS[name]
+            invalid = np.flatnonzero(~np.isfinite(data) | (data < low) | (data > high))
+            if invalid.size:
+                raise ValueError(f"{name} out of range [{low}, {high}] at indexes {invalid[:10].tolist()}")
+
+    async def _append(self, db: AsyncSession, rows: List[dict]):
+        await db.execute(insert(ResourceMetric), rows)
+        await self._upsert_rollups(db, rows)
+
+    async def _update_latest(self, db: AsyncSession, rows: List[dict]):
+        resources = CloudResource.__table__
+        # Chunked to stay well inside bind parameter limits
+        for offset in range(0, len(rows), LATEST_UPDATE_CHUNK):
+            chunk = rows[offset:offset + LATEST_UPDATE_CHUNK]
+
+            def by_id(key: str):
+                return case({row["resource_id"]: row[key] for row in chunk}, value=resources.c.id)
+
+            await db.execute(
+                update(resources)
+                .where(resources.c.id.in_([row["resource_id"] for row in chunk]))
+                .values(
+                    cpu_usage=by_id("cpu_usage"),
+                    memory_usage=by_id("memory_usage"),
+                    memory_available=by_id("memory_available"),
+                    disk_usage=by_id("disk_usage"),
+                    network_usage=by_id("network_usage"),
+                )
+            )
+
+    async def _upsert_rollups(self, db: AsyncSession, rows: List[dict]):
+        buckets: Dict[tuple, dict] = {}
+        for row in rows:
+            for resolution in RESOLUTIONS:
+                key = (row["resource_id"], resolution, bucket_start(row["timestamp"], resolution))
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = {"resource_id": key[0], "resolution": key[1], "bucket_start": key[2], "sample_count": 0}
+                    for metric in ROLLUP_METRICS:
+                        bucket[f"{metric}_min"] = row[metric]
+                        bucket[f"{metric}_max"] = row[metric]
+                        bucket[f"{metric}_sum"] = 0.0
+                    buckets[key] = bucket
+                bucket["sample_count"] += 1
+                for metric in ROLLUP_METRICS:
+                    value = row[metric]
+                    bucket[f"{metric}_min"] = min(bucket[f"{metric}_min"], value)
+                    bucket[f"{metric}_max"] = max(bucket[f"{metric}_max"], value)
+                    bucket[f"{metric}_sum"] += value
+
+        # Sorted so concurrent ingests lock buckets in the same order
+        params = [buckets[key] for key in sorted(buckets)]
+        await db.execute(self._rollup_upsert(db.bind.dialect.name), params)
+
+    def _rollup_upsert(self, dialect_name: str):
+        if dialect_name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            least, greatest = func.least, func.greatest
+        elif dialect_name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            # SQLite's multi-argument min()/max() are scalar functions
+            least, greatest = func.min, func.max
+        else:
+            raise ValueError(f"Metric rollups are not supported on {dialect_name}")
+
+        table = ResourceMetricRollup.__table__
+        statement = dialect_insert(table)
+        excluded = statement.excluded
+        updates = {"sample_count": table.c.sample_count + excluded.sample_count}
+        for metric in ROLLUP_METRICS:
+            updates[f"{metric}_min"] = least(table.c[f"{metric}_min"], excluded[f"{metric}_min"])
+            updates[f"{metric}_max"] = greatest(table.c[f"{metric}_max"], excluded[f"{metric}_max"])
+            updates[f"{metric}_sum"] = table.c[f"{metric}_sum"] + excluded[f"{metric}_sum"]
+        return statement.on_conflict_do_update(
+            index_elements=["resource_id", "resolution", "bucket_start"], set_=updates
+        )
+
+    async def _query_raw(
+            self, db: AsyncSession, resource_id: int, start: datetime, end: datetime
+    ) -> List[dict]:
+        result = await db.execute(
+            select(ResourceMetric.timestamp, *[getattr(ResourceMetric, metric) for metric in ROLLUP_METRICS])
+            .where(ResourceMetric.resource_id == resource_id)
+            .where(ResourceMetric.timestamp >= start)
+            .where(ResourceMetric.timestamp < end)
+            .order_by(ResourceMetric.timestamp)
+        )
+        points = []
+        for row in result:
+            point = {"timestamp": row.timestamp, "sample_count": 1}
+            for metric in ROLLUP_METRICS:
+                value = getattr(row, metric) or 0.0
+                point[metric] = {"min": value, "max": value, "avg": value}
+            points.append(point)
+        return points
+
+    async def _query_rollup(
+            self, db: AsyncSession, resource_id: int, resolution: str, start: datetime, end: datetime
+    ) -> List[dict]:
+        result = await db.execute(
+            select(ResourceMetricRollup)
+            .where(ResourceMetricRollup.resource_id == resource_id)
+            .where(ResourceMetricRollup.resolution == resolution)
+            .where(ResourceMetricRollup.bucket_start >= bucket_start(start, resolution))
+            .where(ResourceMetricRollup.bucket_start < end)
+            .order_by(ResourceMetricRollup.bucket_start)
+        )
+        points = []
+        for rollup in result.scalars():
+            point = {"timestamp": rollup.bucket_start, "sample_count": rollup.sample_count}
+            for metric in ROLLUP_METRICS:
+                point[metric] = {
+                    "min": getattr(rollup, f"{metric}_min"),
+                    "max": getattr(rollup, f"{metric}_max"),
+                    "avg": getattr(rollup, f"{metric}_sum") / rollup.sample_count,
+                }
+            points.append(point)
+        return points
@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.enum.resource_type import ResourceType
+from app.enum.status_enum import StatusEnum
+from app.models.cloud_resource import CloudResource
+from app.utils.cache import SharedTTLCache
+from app.utils.event_bus import EventBus, event_bus
+
+# Event bus channel carrying comma-separated ids of changed resources
+BUS_CHANNEL = "resource-cache"
+
+
+class ResourceSnapshot(NamedTuple):
+    """Read-only copy of a CloudResource row, safe to share between requests"""
+    id: int
+    owner_id: int
+    name: str
+    resource_type: Optional[ResourceType]
+    status: Optional[StatusEnum]
+    ip_address: Optional[str]
+    created_at: datetime
+    under_attack: bool
+    cpu_usage: float
+    memory_usage: float
+    memory_total: float
+    memory_available: float
+    disk_usage: float
+    network_usage: float
+
+
+SNAPSHOT_COLUMNS = [getattr(CloudResource, field) for field in ResourceSnapshot._fields]
+
+
+class ResourceCache:
+    """Read-through cache of resource snapshots keyed by id
+
+    Writers call invalidate() after committing. With bus invalidation on,
+    the ids are also published so every other worker drops its copy;
+    otherwise other workers see the change once their entry expires.
+    """
+
+    def __init__(self, max_size: int, ttl: float, bus: Optional[EventBus] = None):
+        self._cache: SharedTTLCache[ResourceSnapshot] = SharedTTLCache(max_size, ttl, BUS_CHANNEL, bus)
+
+    async def get(self, db: AsyncSession, resource_id: int) -> Optional[ResourceSnapshot]:
+        snapshot = self._cache.get(resource_id)
+        if snapshot is not None:
+            return snapshot
+        generation = self._cache.generation()
+        row = (await db.execute(select(*SNAPSHOT_COLUMNS).where(CloudResource.id == resource_id))).first()
+        if row is None:
+            return None
+        snapshot = ResourceSnapshot(*row)
+        # Not kept if the resource was invalidated, here or on the bus, while it loaded
+        self._cache.set(resource_id, snapshot, generation=generation)
+        return snapshot
+
+    async def invalidate(self, *resource_ids: int):
+        await self.invalidate_many(resource_ids)
+
+    async def invalidate_many(self, resource_ids: Iterable[int]):
+        await self._cache.invalidate_everywhere(resource_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+resource_cache = ResourceCache(
+    settings.RESOURCE_CACHE_MAX_SIZE,
+    settings.RESOURCE_CACHE_TTL,
+    event_bus if settings.RESOURCE_CACHE_BUS_INVALIDATION else None,
+)
@@ -1,17 +1,37 @@
-from typing import List, Optional
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Set, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import Row, and_, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
+from app.core.config import settings
+from app.core.database import new_session
+from app.enum.resource_sort import ResourceSort
 from app.enum.resource_type import ResourceType
+from app.enum.sort_order import SortOrder
 from app.enum.status_enum import StatusEnum
 from app.models.cloud_resource import CloudResource
 from app.models.resource_metric import ResourceMetric
 from app.schemas.cloud_resource_base import CloudResourceCreate
+from app.services.impact_model import ImpactModel, impact_model
+from app.services.resource_cache import ResourceCache, ResourceSnapshot, resource_cache
+from app.utils.pagination import decode_cursor, encode_cursor, estimate_count
+
+# Columns returned by the resource list endpoint; id is also the keyset tiebreaker
+RESPONSE_COLUMNS = (
+    CloudResource.id, CloudResource.name, CloudResource.resource_type, CloudResource.status,
+    CloudResource.ip_address, CloudResource.created_at, CloudResource.under_attack,
+)
+RESPONSE_KEYS = {column.key for column in RESPONSE_COLUMNS}
 
 
 class ResourceService:
+    def __init__(self, model: Optional[ImpactModel] = None, cache: Optional[ResourceCache] = None):
+        self.impact_model = model or impact_model
+        self.cache = cache or resource_cache
+        self._activation_tasks: Set[asyncio.Task] = set()
+
     async def create_resource(
             self, db: AsyncSession, resource_data: CloudResourceCreate
     ) -> CloudResource:
@@ -52,8 +72,9 @@ class ResourceService:
         await self.create_initial_metrics(db, resource.id)
 
         # Simulate resource becoming available after creation
-        import asyncio
-        asyncio.create_task(self._activate_resource(db, resource.id))
+        task = asyncio.create_task(self._activate_resource(resource.id))
+        self._activation_tasks.add(task)
+        task.add_done_callback(self._activation_tasks.discard)
 
         return resource
 
@@ -78,44 +99,133 @@ class ResourceService:
         db.add(metric)
         await db.commit()
 
-    async def _activate_resource(self, db: AsyncSession, resource_id: int):
+    async def _activate_resource(self, resource_id: int):
         """Simulate resource activation after a delay"""
-        import asyncio
         await asyncio.sleep(5)  # Wait 5 seconds
 
-        async with AsyncSession(db.bind) as session:
+        # The request session is closed by now, so use a dedicated one
+        async with new_session() as session:
             resource = await self.get_resource(session, resource_id)
             if resource:
                 resource.status = StatusEnum.running
                 # Set some baseline usage
-                resource.cpu_usage = 5.0 + (hash(resource.name) % 10)  # 5-15%
-                resource.memory_usage = 1.0 + (hash(resource.name) % 3)  # 1-4GB
+                baseline = self.impact_model.baseline(resource.name)
+                resource.cpu_usage = baseline.cpu_usage
+                resource.memory_usage = baseline.memory_usage
                 resource.memory_available = resource.memory_total - resource.memory_usage
-                resource.disk_usage = 10.0 + (hash(resource.name) % 20)  # 10-30%
-                resource.network_usage = 50.0 + (hash(resource.name) % 100)  # 50-150 Mbps
+                resource.disk_usage = baseline.disk_usage
+                resource.network_usage = baseline.network_usage
                 await session.commit()
-
-    async def get_resources(self, db: AsyncSession, owner_id: Optional[int] = None) -> List[CloudResource]:
-        """Get all cloud resources, optionally filtered by owner"""
-        query = select(CloudResource).options(joinedload(CloudResource.owner))
-
-        if owner_id:
+                await self.cache.invalidate(resource_id)
+
+    async def get_resources(
+            self,
+            db: AsyncSession,
+            limit: int = 100,
+            cursor: Optional[str] = None,
+            sort: ResourceSort = ResourceSort.id,
+            order: SortOrder = SortOrder.asc,
+            owner_id: Optional[int] = None,
+            resource_type: Optional[ResourceType] = None,
+            status: Optional[StatusEnum] = None,
+            under_attack: Optional[bool] = None,
+            min_cpu: Optional[float] = None,
+            max_cpu: Optional[float] = None,
+            min_memory: Optional[float] = None,
+            max_memory: Optional[float] = None,
+    ) -> Tuple[List[Row], Optional[str], int]:
+        """Get a page of cloud resources, the cursor for the next page and the total count
+
+        Pages are keyed on (sort column, id) and only the columns of
+        CloudResourceResponse are selected. The total is estimated on large
+        tables. Raises ValueError for a malformed cursor.
+        """
+        column = getattr(CloudResource, sort.value)
+        columns = RESPONSE_COLUMNS
+        if sort.value not in RESPONSE_KEYS:
+            # The cursor is built from the sort column of the last row
+            columns += (column,)
+        query = select(*columns)
+
+        if owner_id is not None:
             query = query.where(CloudResource.owner_id == owner_id)
-
-        result = await db.execute(query)
-        return result.scalars().all()
+        if resource_type is not None:
+            query = query.where(CloudResource.resource_type == resource_type)
+        if status is not None:
+            query = query.where(CloudResource.status == status)
+        if under_attack is not None:
+            query = query.where(CloudResource.under_attack == under_attack)
+        if min_cpu is not None:
+            query = query.where(CloudResource.cpu_usage >= min_cpu)
+        if max_cpu is not None:
+            query = query.where(CloudResource.cpu_usage <= max_cpu)
+        if min_memory is not None:
+            query = query.where(CloudResource.memory_usage >= min_memory)
+        if max_memory is not None:
+            query = query.where(CloudResource.memory_usage <= max_memory)
+
+        total = await estimate_count(db, query, settings.RESOURCE_EXACT_COUNT_BELOW)
+
+        key = (column, CloudResource.id) if sort != ResourceSort.id else (CloudResource.id,)
+        if cursor:
+            query = query.where(self._after_cursor(key, self._decode_cursor(cursor, sort), order))
+        # NULLs sort after every value ascending and before them descending, on every database
+        if order == SortOrder.desc:
+            query = query.order_by(column.desc().nulls_first(), *(part.desc() for part in key[1:]))
+        else:
+            query = query.order_by(column.asc().nulls_last(), *key[1:])
+        # One extra row tells us whether another page exists
+        query = query.limit(limit + 1)
+
+        rows = (await db.execute(query)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(*(getattr(last, part.key) for part in key))
+        return rows, next_cursor, total
+
+    def _decode_cursor(self, cursor: str, sort: ResourceSort) -> tuple:
+        if sort == ResourceSort.id:
+            return (int(decode_cursor(cursor, 1)[0]),)
+        value, resource_id = decode_cursor(cursor, 2)
+        if value == "" and CloudResource.__table__.c[sort.value].nullable:
+            value = None
+        elif sort == ResourceSort.created_at:
+            value = datetime.fromisoformat(value)
+        elif sort in (ResourceSort.cpu_usage, ResourceSort.memory_usage):
+            value = float(value)
+        return value, int(resource_id)
+
+    def _after_cursor(self, key: tuple, values: tuple, order: SortOrder):
+        """Rows past the cursor in (sort column, id) order, NULLs last when ascending"""
+        if len(key) == 1:
+            return key[0] < values[0] if order == SortOrder.desc else key[0] > values[0]
+        (column, row_id), (value, cursor_id) = key, values
+        if order == SortOrder.desc:
+            if value is None:
+                return or_(and_(column.is_(None), row_id < cursor_id), column.is_not(None))
+            # Comparisons with NULL are never true, so NULL rows (already passed) drop out
+            return tuple_(column, row_id) < tuple_(value, cursor_id)
+        if value is None:
+            return and_(column.is_(None), row_id > cursor_id)
+        return or_(tuple_(column, row_id) > tuple_(value, cursor_id), column.is_(None))
 
     async def get_resource(
             self, db: AsyncSession, resource_id: int
     ) -> Optional[CloudResource]:
         """Get a specific cloud resource by ID"""
         result = await db.execute(
-            select(CloudResource)
-            .options(joinedload(CloudResource.owner))
-            .where(CloudResource.id == resource_id)
+            select(CloudResource).where(CloudResource.id == resource_id)
         )
         return result.scalars().first()
 
+    async def get_resource_snapshot(
+            self, db: AsyncSession, resource_id: int
+    ) -> Optional[ResourceSnapshot]:
+        """Get a read-only copy of a resource, served from the cache when possible"""
+        return await self.cache.get(db, resource_id)
+
     async def update_resource_metrics(
             self, db: AsyncSession, resource_id: int,
             cpu_usage: float = None, memory_usage: float = None,
@@ -135,6 +245,7 @@ class ResourceService:
                 resource.network_usage = network_usage
 
             await db.commit()
+            await self.cache.invalidate(resource_id)
             await db.refresh(resource)
         return resource
 
@@ -147,25 +258,11 @@ class ResourceService:
             return None
 
         # Calculate attack impact based on attack type
-        memory_impact = 0.0
-        cpu_impact = 0.0
-
-        if attack_type == "heap-overflow":
-            memory_impact = 2.0 + (hash(str(resource_id)) % 3)  # 2-5GB memory leak
-            cpu_impact = 15.0 + (hash(str(resource_id)) % 10)  # 15-25% CPU spike
-        elif attack_type == "stack-overflow":
-            memory_impact = 1.5 + (hash(str(resource_id)) % 2)  # 1.5-3.5GB
-            cpu_impact = 20.0 + (hash(str(resource_id)) % 15)  # 20-35% CPU spike
-        elif attack_type == "format-string":
-            memory_impact = 0.5 + (hash(str(resource_id)) % 1)  # 0.5-1.5GB
-            cpu_impact = 10.0 + (hash(str(resource_id)) % 10)  # 10-20% CPU spike
-        elif attack_type == "off-by-one":
-            memory_impact = 0.3 + (hash(str(resource_id)) % 1)  # 0.3-1.3GB
-            cpu_impact = 8.0 + (hash(str(resource_id)) % 7)  # 8-15% CPU spike
+        impact = self.impact_model.impact(resource_id, attack_type)
 
         # Apply the impact
-        new_memory_usage = min(resource.memory_usage + memory_impact, resource.memory_total * 0.95)
-        new_cpu_usage = min(resource.cpu_usage + cpu_impact, 100.0)
+        new_memory_usage = min(resource.memory_usage + impact.memory, resource.memory_total * 0.95)
+        new_cpu_usage = min(resource.cpu_usage + impact.cpu, 100.0)
 
         resource.memory_usage = new_memory_usage
         resource.memory_available = resource.memory_total - new_memory_usage
@@ -173,9 +270,26 @@ class ResourceService:
         resource.under_attack = True
 
         await db.commit()
+        await self.cache.invalidate(resource_id)
         await db.refresh(resource)
         return resource
 
+    async def apply_impact(
+            self, db: AsyncSession, resource_id: int, memory_impact: float, cpu_impact: float
+    ) -> Optional[CloudResource]:
+        """Add memory (GB) and CPU (%) usage to a resource, within its limits"""
+        resource = await self.get_resource(db, resource_id)
+        if not resource:
+            return None
+
+        resource.memory_usage = min(max(resource.memory_usage + memory_impact, 0.0), resource.memory_total * 0.95)
+        resource.memory_available = resource.memory_total - resource.memory_usage
+        resource.cpu_usage = min(max(resource.cpu_usage + cpu_impact, 0.0), 100.0)
+
+        await db.commit()
+        await self.cache.invalidate(resource_id)
+        return resource
+
     async def restore_resource_after_mitigation(
             self, db: AsyncSession, resource_id: int
     ) -> Optional[CloudResource]:
@@ -185,15 +299,15 @@ class ResourceService:
             return None
 
         # Gradually restore to baseline levels
-        baseline_memory = 1.0 + (hash(resource.name) % 3)  # 1-4GB baseline
-        baseline_cpu = 5.0 + (hash(resource.name) % 10)  # 5-15% baseline
+        baseline = self.impact_model.baseline(resource.name)
 
-        resource.memory_usage = baseline_memory
-        resource.memory_available = resource.memory_total - baseline_memory
-        resource.cpu_usage = baseline_cpu
+        resource.memory_usage = baseline.memory_usage
+        resource.memory_available = resource.memory_total - baseline.memory_usage
+        resource.cpu_usage = baseline.cpu_usage
         resource.under_attack = False
 
         await db.commit()
+        await self.cache.invalidate(resource_id)
         await db.refresh(resource)
         return resource
 
@@ -205,6 +319,7 @@ class ResourceService:
         if resource:
             resource.status = status
             await db.commit()
+            await self.cache.invalidate(resource_id)
             await db.refresh(resource)
         return resource
 
@@ -216,6 +331,7 @@ class ResourceService:
         if resource:
             resource.under_attack = under_attack
             await db.commit()
+            await self.cache.invalidate(resource_id)
             await db.refresh(resource)
         return resource
 
@@ -225,5 +341,6 @@ class ResourceService:
         if resource:
             await db.delete(resource)
             await db.commit()
+            await self.cache.invalidate(resource_id)
             return True
         return False
@@ -0,0 +1,125 @@
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+import yaml
+
+from app.core.config import settings
+from app.enum.attack_type import AttackType, attack_type_value
+
+# Bundled scenarios, one YAML file per attack type
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scenarios")
+
+# File with the fallback scenario and the steps every attack type shares
+DEFAULT_SCENARIO = "default"
+
+STEP_FIELDS = {"level", "message", "process", "delay", "memory_impact", "cpu_impact"}
+
+
+class Step(NamedTuple):
+    level: str
+    message: str
+    process: str
+    delay: float
+    memory_impact: float = 0.0  # GB added to the resource
+    cpu_impact: float = 0.0  # % added to the resource
+
+
+class Scenario(NamedTuple):
+    attack_type: str
+    details: str
+    attack_steps: Tuple[Step, ...]
+    countermeasure_steps: Tuple[Step, ...]
+
+
+def compile_steps(raw: Optional[list], attack_type: str, default_delay: float, source: str) -> Tuple[Step, ...]:
+    """Turn a YAML step list into Step tuples; raises ValueError on bad input"""
+    steps = []
+    for index, entry in enumerate(raw or ()):
+        if not isinstance(entry, dict) or not {"level", "message", "process"} <= entry.keys():
+            raise ValueError(f"{source}: step {index} needs level, message and process")
+        unknown = entry.keys() - STEP_FIELDS
+        if unknown:
+            raise ValueError(f"{source}: step {index} has unknown fields {sorted(unknown)}")
+        steps.append(Step(
+            level=entry["level"],
+            message=str(entry["message"]).replace("{attack_type}", attack_type),
+            process=entry["process"],
+            delay=float(entry.get("delay", default_delay)),
+            memory_impact=float(entry.get("memory_impact", 0.0)),
+            cpu_impact=float(entry.get("cpu_impact", 0.0)),
+        ))
+    return tuple(steps)
+
+
+def _read(path: str) -> dict:
+    with open(path) as handle:
+        document = yaml.safe_load(handle) or {}
+    if not isinstance(document, dict):
+        raise ValueError(f"{path}: expected a mapping")
+    return document
+
+
+class ScenarioRegistry:
+    """Attack and countermeasure playbooks compiled once from YAML files
+
+    Steps are immutable and messages are rendered at load time, so playing
+    a scenario allocates nothing per run. Attack types without a file get
+    the default scenario, compiled on first use and kept.
+    """
+
+    def __init__(self, default: dict, documents: Dict[str, dict], source: str):
+        self.source = source
+        self._default = default
+        self._scenarios: Dict[str, Scenario] = {
+            attack_type: self._compile(attack_type, document)
+            for attack_type, document in documents.items()
+        }
+
+    @classmethod
+    def load(cls, directory: str = SCENARIO_DIR) -> "ScenarioRegistry":
+        default = {}
+        documents = {}
+        for filename in sorted(os.listdir(directory)):
+            name, extension = os.path.splitext(filename)
+            if extension not in (".yaml", ".yml"):
+                continue
+            document = _read(os.path.join(directory, filename))
+            if name == DEFAULT_SCENARIO:
+                default = document
+            else:
+                documents[document.get("attack_type", name)] = document
+        return cls(default, documents, directory)
+
+    def get(self, attack_type: Union[AttackType, str]) -> Scenario:
+        """Scenario for an attack type, falling back to the default one"""
+        attack_type = attack_type_value(attack_type)
+        scenario = self._scenarios.get(attack_type)
+        if scenario is None:
+            scenario = self._scenarios[attack_type] = self._compile(attack_type, {})
+        return scenario
+
+    def attack_types(self) -> List[str]:
+        return sorted(self._scenarios)
+
+    def _compile(self, attack_type: str, document: dict) -> Scenario:
+        source = os.path.join(self.source, f"{attack_type}.yaml")
+        default = self._default
+        attack = (
+            compile_steps(default.get("attack_prelude"), attack_type, 2, source)
+            + compile_steps(document.get("attack"), attack_type, 2, source)
+            + compile_steps(default.get("attack_epilogue"), attack_type, 2, source)
+        )
+        countermeasure = (
+            compile_steps(default.get("countermeasure_prelude"), attack_type, 1, source)
+            # Types without their own countermeasure get the generic one
+            + compile_steps(document.get("countermeasure", default.get("countermeasure")), attack_type, 1, source)
+        )
+        return Scenario(
+            attack_type=attack_type,
+            details=document.get("details", default.get("details", "Unknown attack vector detected")),
+            attack_steps=attack,
+            countermeasure_steps=countermeasure,
+        )
+
+
+scenario_registry = ScenarioRegistry.load(settings.SCENARIO_DIR or SCENARIO_DIR)
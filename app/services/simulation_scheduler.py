@@ -0,0 +1,355 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import new_session
+from app.enum.attack_type import AttackType, attack_type_value
+from app.enum.job_kind import JobKind
+from app.enum.job_status import JobStatus
+from app.enum.status_enum import StatusEnum
+from app.models.simulation_job import SimulationJob
+from app.services.attack_service import AttackService
+from app.services.countermeasure_service import CountermeasureService
+from app.utils.websocket_manager import ConnectionManager, manager
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (JobStatus.pending.value, JobStatus.running.value)
+
+# Called with the job and its final status whenever a local job stops
+JobListener = Callable[[SimulationJob, JobStatus], None]
+
+
+class SimulationScheduler:
+    """Runs attack simulations and countermeasures from the simulation_jobs table
+
+    Every job runs in a tracked task with its own session, at most
+    max_concurrency per worker. Running jobs heartbeat; a job that is still
+    pending, or whose heartbeat went stale because its worker died, is
+    claimed again by the maintenance loop of whichever worker has room.
+    Claiming is a conditional UPDATE, so a job only ever runs once at a time.
+    """
+
+    def __init__(self, max_concurrency: int = settings.SIMULATION_MAX_CONCURRENCY,
+                 broadcaster: Optional[ConnectionManager] = None):
+        self.max_concurrency = max_concurrency
+        self.manager = broadcaster or manager
+        self.attack_service = AttackService()
+        self.countermeasure_service = CountermeasureService()
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._cancelled: Set[int] = set()
+        self._listeners: List[JobListener] = []
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._closing = False
+        # Set when a job was left pending for lack of a slot
+        self._backlog = False
+        self._filling = False
+        self._fill_tasks: Set[asyncio.Task] = set()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.resumed = 0
+
+    async def start(self):
+        """Start heartbeats and pick up jobs left over from earlier runs"""
+        self._closing = False
+        self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def close(self):
+        """Stop every local job; they go back to pending for the next worker"""
+        self._closing = True
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            await asyncio.gather(self._maintenance_task, return_exceptions=True)
+            self._maintenance_task = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def submit(
+            self,
+            db: AsyncSession,
+            kind: JobKind,
+            attack_id: int,
+            resource_id: int,
+            attack_type: AttackType,
+    ) -> SimulationJob:
+        """Persist a job and start it if this worker has a free slot"""
+        job = SimulationJob(
+            kind=kind.value,
+            status=JobStatus.pending.value,
+            attack_id=attack_id,
+            resource_id=resource_id,
+            attack_type=attack_type_value(attack_type),
+            attempts=0,
+        )
+        db.add(job)
+        await db.commit()
+        self.submitted += 1
+        self._launch(job.id)
+        return job
+
+    async def submit_many(
+            self,
+            db: AsyncSession,
+            kind: JobKind,
+            targets: Sequence[Tuple[int, int]],
+            attack_type: AttackType,
+            campaign_id: Optional[int] = None,
+    ) -> List[int]:
+        """Persist one job per (attack_id, resource_id) in a single INSERT and start what fits
+
+        Commits the session, including anything the caller added to it.
+        """
+        attack_type = attack_type_value(attack_type)
+        rows = [
+            {
+                "kind": kind.value,
+                "status": JobStatus.pending.value,
+                "attack_id": attack_id,
+                "resource_id": resource_id,
+                "attack_type": attack_type,
+                "campaign_id": campaign_id,
+                "attempts": 0,
+                "created_at": datetime.utcnow(),
+            }
+            for attack_id, resource_id in targets
+        ]
+        job_ids = (await db.execute(
+            insert(SimulationJob).returning(SimulationJob.id, sort_by_parameter_order=True), rows
+        )).scalars().all()
+        await db.commit()
+        self.submitted += len(job_ids)
+        for job_id in job_ids:
+            if not self._launch(job_id):
+                break
+        return job_ids
+
+    def add_listener(self, listener: JobListener):
+        self._listeners.append(listener)
+
+    async def get_attack_jobs(self, db: AsyncSession, attack_id: int) -> List[SimulationJob]:
+        """Get all jobs of an attack, oldest first"""
+        result = await db.execute(
+            select(SimulationJob)
+            .where(SimulationJob.attack_id == attack_id)
+            .order_by(SimulationJob.id)
+        )
+        return result.scalars().all()
+
+    async def cancel_attack_jobs(self, db: AsyncSession, attack_id: int) -> List[SimulationJob]:
+        """Cancel the pending and running jobs of an attack, on whichever worker they run
+
+        Nothing would move the attack on afterwards, so it is stopped and its
+        resource released in the same transaction; a mitigated attack stays as is.
+        """
+        result = await db.execute(
+            update(SimulationJob)
+            .where(SimulationJob.attack_id == attack_id)
+            .where(SimulationJob.status.in_(ACTIVE_STATUSES))
+            .values(status=JobStatus.cancelled.value, finished_at=datetime.utcnow())
+            .returning(SimulationJob)
+        )
+        jobs = result.scalars().all()
+        # Commits the cancelled jobs too
+        attack = await self.attack_service.lifecycle.transition(
+            db, attack_id, StatusEnum.stopped, under_attack=False,
+            logs=[("warning", "Attack simulation cancelled", "attack-simulator")],
+        )
+        if attack:
+            await self.manager.broadcast_attack(attack)
+        # Jobs running elsewhere stop at that worker's next heartbeat
+        for job in jobs:
+            self._cancel_local(job.id)
+        return jobs
+
+    async def maintain(self):
+        """Heartbeat local jobs, stop cancelled ones and claim orphaned ones"""
+        now = datetime.utcnow()
+        async with new_session() as session:
+            local = list(self._tasks)
+            if local:
+                await session.execute(
+                    update(SimulationJob)
+                    .where(SimulationJob.id.in_(local))
+                    .where(SimulationJob.status == JobStatus.running.value)
+                    .values(heartbeat_at=now)
+                )
+                cancelled = (await session.execute(
+                    select(SimulationJob.id)
+                    .where(SimulationJob.id.in_(local))
+                    .where(SimulationJob.status == JobStatus.cancelled.value)
+                )).scalars().all()
+                await session.commit()
+                for job_id in cancelled:
+                    self._cancel_local(job_id)
+
+        await self._fill_slots()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": len(self._tasks),
+            "max_concurrency": self.max_concurrency,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "resumed": self.resumed,
+            "backlog": self._backlog,
+        }
+
+    async def _fill_slots(self):
+        """Start pending and orphaned jobs until this worker's slots are full"""
+        free = self.max_concurrency - len(self._tasks)
+        if free <= 0 or self._closing or self._filling:
+            return
+        self._filling = True
+        try:
+            async with new_session() as session:
+                claimable = (await session.execute(
+                    select(SimulationJob.id)
+                    .where(self._claimable(datetime.utcnow()))
+                    .order_by(SimulationJob.created_at, SimulationJob.id)
+                    .limit(free)
+                )).scalars().all()
+            self._backlog = len(claimable) == free
+            for job_id in claimable:
+                self._launch(job_id)
+        finally:
+            self._filling = False
+
+    def _on_task_done(self, job_id: int):
+        self._tasks.pop(job_id, None)
+        if self._backlog and not self._closing:
+            # A slot freed up and jobs are waiting: start the next one now
+            task = asyncio.get_running_loop().create_task(self._fill_slots())
+            self._fill_tasks.add(task)
+            task.add_done_callback(self._fill_tasks.discard)
+
+    def _claimable(self, now: datetime):
+        stale = now - timedelta(seconds=settings.SIMULATION_STALE_AFTER)
+        return or_(
+            SimulationJob.status == JobStatus.pending.value,
+            and_(SimulationJob.status == JobStatus.running.value, SimulationJob.heartbeat_at < stale),
+        )
+
+    def _launch(self, job_id: int) -> bool:
+        if self._closing or job_id in self._tasks:
+            return False
+        if len(self._tasks) >= self.max_concurrency:
+            # Stays pending until a slot frees up
+            self._backlog = True
+            return False
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._on_task_done(job_id))
+        return True
+
+    def _cancel_local(self, job_id: int):
+        task = self._tasks.get(job_id)
+        if task is not None:
+            self._cancelled.add(job_id)
+            task.cancel()
+
+    async def _run(self, job_id: int):
+        job = None
+        try:
+            async with new_session() as session:
+                job = await self._claim(session, job_id)
+                if job is None:
+                    # Claimed by another worker, finished or cancelled meanwhile
+                    return
+                if job.attempts > 1:
+                    self.resumed += 1
+                await self._execute(session, job)
+            await self._finish(job_id, JobStatus.completed)
+            self.completed += 1
+            self._notify(job, JobStatus.completed)
+        except asyncio.CancelledError:
+            if job_id in self._cancelled:
+                # Already marked cancelled by cancel_attack_jobs
+                self._cancelled.discard(job_id)
+                self.cancelled += 1
+                if job is not None:
+                    self._notify(job, JobStatus.cancelled)
+            else:
+                # Shutting down: hand the job back so it resumes elsewhere
+                await self._finish(job_id, JobStatus.pending)
+            raise
+        except Exception as exc:
+            logger.exception("Simulation job %s failed", job_id)
+            self.failed += 1
+            await self._finish(job_id, JobStatus.failed, error=str(exc))
+            if job is not None:
+                self._notify(job, JobStatus.failed)
+
+    def _notify(self, job: SimulationJob, status: JobStatus):
+        for listener in self._listeners:
+            try:
+                listener(job, status)
+            except Exception:
+                logger.exception("Simulation job listener failed")
+
+    async def _claim(self, session: AsyncSession, job_id: int) -> Optional[SimulationJob]:
+        now = datetime.utcnow()
+        result = await session.execute(
+            update(SimulationJob)
+            .where(SimulationJob.id == job_id)
+            .where(self._claimable(now))
+            .values(
+                status=JobStatus.running.value,
+                started_at=now,
+                heartbeat_at=now,
+                attempts=SimulationJob.attempts + 1,
+            )
+            .returning(SimulationJob)
+        )
+        job = result.scalars().first()
+        await session.commit()
+        return job
+
+    async def _execute(self, session: AsyncSession, job: SimulationJob):
+        attack_type = AttackType(job.attack_type)
+        if job.kind == JobKind.attack.value:
+            await self.attack_service.simulate_attack(
+                session, job.attack_id, job.resource_id, attack_type, self.manager
+            )
+        elif job.kind == JobKind.countermeasure.value:
+            await self.countermeasure_service.deploy_countermeasure(
+                session, job.attack_id, job.resource_id, attack_type, self.manager
+            )
+        else:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+
+    async def _finish(self, job_id: int, status: JobStatus, error: Optional[str] = None):
+        # Only a job this worker still owns as running changes state here
+        async with new_session() as session:
+            await session.execute(
+                update(SimulationJob)
+                .where(SimulationJob.id == job_id)
+                .where(SimulationJob.status == JobStatus.running.value)
+                .values(
+                    status=status.value,
+                    error=error,
+                    finished_at=None if status == JobStatus.pending else datetime.utcnow(),
+                )
+            )
+            await session.commit()
+
+    async def _maintenance_loop(self):
+        while True:
+            try:
+                await self.maintain()
+            except Exception:
+                logger.exception("Simulation scheduler maintenance failed")
+            await asyncio.sleep(settings.SIMULATION_HEARTBEAT_INTERVAL)
+
+
+simulation_scheduler = SimulationScheduler()
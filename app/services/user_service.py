@@ -1,19 +1,52 @@
-from typing import List, Optional, Any, Coroutine, Sequence
+from typing import NamedTuple, Optional, Sequence, Tuple
 
-from sqlalchemy import select, or_, Row, RowMapping
+from sqlalchemy import and_, case, func, select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.enum.user_role import UserRole
+from app.models.cloud_resource import CloudResource
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.utils.security import get_password_hash
+from app.utils.cache import SharedTTLCache
+from app.utils.event_bus import event_bus
+from app.utils.security import PasswordHasher, password_hasher
+
+# Resource columns returned in UserWithResources; owner_id links them back to their user
+RESOURCE_COLUMNS = (
+    CloudResource.id, CloudResource.owner_id, CloudResource.name, CloudResource.resource_type,
+    CloudResource.status, CloudResource.ip_address, CloudResource.created_at, CloudResource.under_attack,
+)
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input only matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class Principal(NamedTuple):
+    """What authorization needs to know about the user behind a request"""
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+
+
+# Principals by user id; role changes and deactivation drop them on every worker
+principal_cache: SharedTTLCache[Principal] = SharedTTLCache(
+    settings.AUTH_PRINCIPAL_CACHE_SIZE, settings.AUTH_PRINCIPAL_CACHE_TTL, "principal-cache", event_bus
+)
 
 
 class UserService:
+    def __init__(self, hasher: Optional[PasswordHasher] = None, principals: Optional[SharedTTLCache] = None):
+        self.hasher = hasher or password_hasher
+        self.principals = principal_cache if principals is None else principals
+
     async def create_user(self, db: AsyncSession, user_data: UserCreate) -> User:
-        """Create a new user"""
-        hashed_password = get_password_hash(user_data.password)
+        """Create a new user; raises PasswordHasherBusy when hashing is saturated"""
+        hashed_password = await self.hasher.hash(user_data.password)
         user = User(
             first_name=user_data.first_name,
             email=user_data.email,
@@ -28,47 +61,96 @@ class UserService:
         return user
 
     async def get_users(self, db: AsyncSession) -> Sequence[User]:
-        """Get all users"""
+        """Get all users with their resources"""
         result = await db.execute(
-            select(User).options(joinedload(User.resources))
+            select(User).options(self._with_resources())
         )
         return result.scalars().all()
 
     async def get_user(self, db: AsyncSession, user_id: int) -> Optional[User]:
-        """Get a specific user by ID"""
+        """Get a specific user by ID with their resources"""
         result = await db.execute(
             select(User)
-            .options(joinedload(User.resources))
+            .options(self._with_resources())
             .where(User.id == user_id)
         )
         return result.scalars().first()
 
     async def get_user_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
-        """Get a user by username"""
+        """Get a user by email, without their resources"""
         result = await db.execute(
-            select(User)
-            .options(joinedload(User.resources))
-            .where(User.email == email)
+            select(User).where(User.email == email)
         )
         return result.scalars().first()
 
+    async def get_login_credentials(self, db: AsyncSession, email: str) -> Optional[Tuple[int, str, bool]]:
+        """Get (id, password, is_active) of the user with this email"""
+        result = await db.execute(
+            select(User.id, User.password, User.is_active).where(User.email == email)
+        )
+        return result.first()
+
+    async def get_principal(self, db: AsyncSession, user_id: int) -> Optional[Principal]:
+        """Get the principal of a user, served from the cache when possible"""
+        principal = self.principals.get(user_id)
+        if principal is None:
+            generation = self.principals.generation()
+            row = (await db.execute(
+                select(User.id, User.email, User.role, User.is_active).where(User.id == user_id)
+            )).first()
+            if row is None:
+                return None
+            principal = Principal(*row)
+            # Not kept if the user was deactivated or changed role while it loaded
+            self.principals.set(user_id, principal, generation=generation)
+        return principal
+
     async def search_users(
             self,
             db: AsyncSession,
             query: str,
             role: Optional[UserRole] = None,
-            is_active: Optional[bool] = None
+            is_active: Optional[bool] = None,
+            limit: int = 20,
+            offset: int = 0,
     ) -> Sequence[User]:
-        """Search users by query string"""
-        search_query = select(User).options(joinedload(User.resources))
+        """Search users by email and name, best matches first
+
+        Every word of the query must appear in the email, first name or last
+        name. An exact email match ranks first, then users whose fields
+        start with every word, then the remaining substring matches. On
+        PostgreSQL trigram similarity orders users within a rank and the
+        ILIKE filters use the trigram indexes.
+        """
+        search_query = select(User).options(self._with_resources())
+        fields = (User.email, User.first_name, User.last_name)
 
         # Add text search
-        if query:
-            search_query = search_query.where(
-                or_(
-                    User.email.ilike(f"%{query}%"),
+        terms = query.lower().split() if query else []
+        if terms:
+            for term in terms:
+                pattern = f"%{escape_like(term)}%"
+                search_query = search_query.where(
+                    or_(*(field.ilike(pattern, escape="\\") for field in fields))
                 )
+            prefix_match = and_(*(
+                or_(*(field.ilike(f"{escape_like(term)}%", escape="\\") for field in fields))
+                for term in terms
+            ))
+            rank = case(
+                (func.lower(User.email) == " ".join(terms), 0),
+                (prefix_match, 1),
+                else_=2,
             )
+            order = [rank]
+            if db.bind.dialect.name == "postgresql":
+                text = " ".join(terms)
+                order.append(func.greatest(*(
+                    func.similarity(func.coalesce(field, ""), text) for field in fields
+                )).desc())
+            search_query = search_query.order_by(*order, User.id)
+        else:
+            search_query = search_query.order_by(User.id)
 
         # Add role filter
         if role:
@@ -78,34 +160,41 @@ class UserService:
         if is_active is not None:
             search_query = search_query.where(User.is_active == is_active)
 
-        result = await db.execute(search_query)
+        result = await db.execute(search_query.limit(limit).offset(offset))
         return result.scalars().all()
 
     async def update_user_role(
             self, db: AsyncSession, user_id: int, role: UserRole
     ) -> Optional[User]:
         """Update a user's role"""
-        user = await self.get_user(db, user_id)
+        user = await db.get(User, user_id)
         if user:
             user.role = role
             await db.commit()
+            await self.principals.invalidate_everywhere([user_id])
             await db.refresh(user)
         return user
 
     async def deactivate_user(self, db: AsyncSession, user_id: int) -> Optional[User]:
         """Deactivate a user"""
-        user = await self.get_user(db, user_id)
+        user = await db.get(User, user_id)
         if user:
             user.is_active = False
             await db.commit()
+            await self.principals.invalidate_everywhere([user_id])
             await db.refresh(user)
         return user
 
     async def delete_user(self, db: AsyncSession, user_id: int) -> bool:
         """Delete a user"""
-        user = await self.get_user(db, user_id)
+        user = await db.get(User, user_id)
         if user:
             await db.delete(user)
             await db.commit()
+            await self.principals.invalidate_everywhere([user_id])
             return True
         return False
+
+    def _with_resources(self):
+        # One extra SELECT ... WHERE owner_id IN (...) rather than a join that repeats every user row
+        return selectinload(User.resources).load_only(*RESOURCE_COLUMNS)
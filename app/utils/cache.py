@@ -0,0 +1,137 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+from app.utils.event_bus import EventBus
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """LRU cache whose entries also expire ``ttl`` seconds after being stored
+
+    Read-through callers take generation() before loading a value and pass
+    it to set(); if the key was invalidated while the value loaded, the
+    set is skipped instead of caching a stale value. Not thread-safe;
+    meant for a single event loop.
+    """
+
+    def __init__(self, max_size: int, ttl: float, timer: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._timer = timer
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # Generation of the last invalidation per key, for the most recent max_size keys;
+        # older keys count as invalidated at _forgotten_generation
+        self._generation = 0
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._forgotten_generation = 0
+        self.stale_sets = 0
+
+    def generation(self) -> int:
+        """Current generation; take it before loading a value to set()"""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._timer():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None, generation: Optional[int] = None):
+        """Store a value; ``ttl`` overrides the cache-wide lifetime for this entry
+
+        With ``generation``, nothing is stored if the key was invalidated since.
+        """
+        if generation is not None and self._invalidated.get(key, self._forgotten_generation) > generation:
+            self.stale_sets += 1
+            return
+        self._entries[key] = (self._timer() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        # Recorded even without an entry: a load may be in flight
+        self._generation += 1
+        self._invalidated[key] = self._generation
+        self._invalidated.move_to_end(key)
+        if len(self._invalidated) > self.max_size:
+            _, self._forgotten_generation = self._invalidated.popitem(last=False)
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self._generation += 1
+        self._invalidated.clear()
+        self._forgotten_generation = self._generation
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_sets": self.stale_sets,
+        }
+
+
+class SharedTTLCache(TTLCache[V]):
+    """TTLCache keyed by integer ids whose invalidations reach every worker
+
+    invalidate_everywhere() drops the ids here and publishes them on
+    ``channel``; without a bus other workers keep them until they expire.
+    """
+
+    def __init__(self, max_size: int, ttl: float, channel: str, bus: Optional[EventBus] = None):
+        super().__init__(max_size, ttl)
+        self.channel = channel
+        self.bus = bus
+        if bus is not None:
+            bus.subscribe(channel, self._on_invalidate)
+
+    async def invalidate_everywhere(self, keys: Iterable[int]):
+        ids: List[int] = list(keys)
+        if not ids:
+            return
+        for key in ids:
+            self.invalidate(key)
+        if self.bus is not None:
+            try:
+                await self.bus.publish(self.channel, ",".join(map(str, ids)).encode())
+            except Exception:
+                # Other workers fall back to expiry
+                logger.exception("Failed to publish invalidation on %s", self.channel)
+
+    async def _on_invalidate(self, topics, data: bytes):
+        for key in data.split(b","):
+            self.invalidate(int(key))
@@ -0,0 +1,120 @@
+import abc
+import asyncio
+import contextvars
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+
+def as_naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC; convert aware ones from clients"""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# Unseeded generator shared by the clocks that follow the wall clock
+_system_rng = random.Random()
+
+
+class Clock(abc.ABC):
+    """Source of time for simulations: the current time, a way to wait and random draws"""
+
+    @abc.abstractmethod
+    def now(self) -> datetime:
+        """The current time as naive UTC"""
+
+    @abc.abstractmethod
+    async def sleep(self, seconds: float):
+        """Wait for ``seconds`` of this clock's time"""
+
+    @abc.abstractmethod
+    def rng(self) -> random.Random:
+        """Random numbers for simulated details such as process ids"""
+
+
+class RealClock(Clock):
+    """Wall-clock time"""
+
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    def rng(self) -> random.Random:
+        return _system_rng
+
+
+class ScaledClock(Clock):
+    """Runs ``scale`` times faster than the wall clock, starting from now"""
+
+    def __init__(self, scale: float):
+        if scale <= 0:
+            raise ValueError("Clock scale must be positive")
+        self.scale = scale
+        self._origin = datetime.utcnow()
+        self._origin_monotonic = time.monotonic()
+
+    def now(self) -> datetime:
+        elapsed = (time.monotonic() - self._origin_monotonic) * self.scale
+        return self._origin + timedelta(seconds=elapsed)
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds / self.scale)
+
+    def rng(self) -> random.Random:
+        return _system_rng
+
+
+class VirtualClock(Clock):
+    """Time only moves when a task sleeps, and sleeping returns immediately
+
+    Each task (and everything it awaits) has its own timeline starting at
+    ``start`` (or the wall clock when the clock was made), so a simulation
+    gets the same timestamps however many others run next to it or before
+    it. Each timeline also draws from its own generator seeded with
+    ``seed``, which makes simulated process ids reproducible too.
+    """
+
+    def __init__(self, start: Optional[datetime] = None, seed: int = 0):
+        self.start = start or datetime.utcnow()
+        self.seed = seed
+        self._now: contextvars.ContextVar[Optional[datetime]] = contextvars.ContextVar("virtual_now", default=None)
+        self._rng: contextvars.ContextVar[Optional[random.Random]] = contextvars.ContextVar("virtual_rng", default=None)
+
+    def now(self) -> datetime:
+        current = self._now.get()
+        if current is None:
+            current = self.start
+            self._now.set(current)
+        return current
+
+    async def sleep(self, seconds: float):
+        self._now.set(self.now() + timedelta(seconds=seconds))
+        # Still yield so other tasks get to run
+        await asyncio.sleep(0)
+
+    def rng(self) -> random.Random:
+        generator = self._rng.get()
+        if generator is None:
+            generator = random.Random(self.seed)
+            self._rng.set(generator)
+        return generator
+
+
+def create_clock(mode: str = settings.CLOCK_MODE) -> Clock:
+    """Build the clock selected by CLOCK_MODE"""
+    if mode == "real":
+        return RealClock()
+    if mode == "scaled":
+        return ScaledClock(settings.CLOCK_SCALE)
+    if mode == "virtual":
+        return VirtualClock(settings.CLOCK_VIRTUAL_START, settings.CLOCK_VIRTUAL_SEED)
+    raise ValueError(f"Unknown clock mode: {mode}")
+
+
+clock = create_clock()
@@ -0,0 +1,214 @@
+import abc
+import asyncio
+import glob
+import logging
+import os
+import socket
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Optional[List[str]], bytes], Awaitable[None]]
+
+TOPIC_SEPARATOR = "\x1f"
+
+
+def encode_message(channel: str, data: bytes, topics: Optional[List[str]] = None) -> bytes:
+    """Pack a message as channel, topics and payload separated by newlines"""
+    header = channel + "\n" + (TOPIC_SEPARATOR.join(topics) if topics is not None else "")
+    return header.encode() + b"\n" + data
+
+
+def decode_message(message: bytes):
+    """Reverse of encode_message; an empty topic line means every topic"""
+    channel, topics, data = message.split(b"\n", 2)
+    topic_list = topics.decode().split(TOPIC_SEPARATOR) if topics else None
+    return channel.decode(), topic_list, data
+
+
+class EventBus(abc.ABC):
+    """Publishes events to every worker, including the one that sent them
+
+    Subscribers register per logical channel. Until start() has been called
+    messages are only delivered inside this process.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+        # Dispatches started from driver callbacks; the loop only keeps weak references
+        self._dispatch_tasks: Set[asyncio.Task] = set()
+        self.started = False
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+
+    def subscribe(self, channel: str, handler: Handler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def start(self):
+        self.started = True
+
+    async def close(self):
+        self.started = False
+
+    async def publish(self, channel: str, data: bytes, topics: Optional[List[str]] = None):
+        self.published += 1
+        message = encode_message(channel, data, topics)
+        if not self.started:
+            await self._dispatch(message)
+            return
+        await self._send(message)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": type(self).__name__,
+            "started": self.started,
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+        }
+
+    @abc.abstractmethod
+    async def _send(self, message: bytes):
+        """Deliver an encoded message to every worker, this one included"""
+
+    def _dispatch_soon(self, message: bytes):
+        """Dispatch from a synchronous callback without waiting for the handlers"""
+        task = asyncio.get_running_loop().create_task(self._dispatch(message))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, message: bytes):
+        self.received += 1
+        channel, topics, data = decode_message(message)
+        for handler in self._handlers.get(channel, ()):
+            try:
+                await handler(topics, data)
+            except Exception:
+                logger.exception("Event bus handler failed on channel %s", channel)
+
+
+class InProcessBus(EventBus):
+    """Single worker: delivers straight to local subscribers"""
+
+    async def _send(self, message: bytes):
+        await self._dispatch(message)
+
+
+class PostgresNotifyBus(EventBus):
+    """Fans out through Postgres LISTEN/NOTIFY on a single channel"""
+
+    # NOTIFY payloads must stay below 8000 bytes
+    MAX_PAYLOAD = 7999
+
+    def __init__(self, dsn: str, channel: str):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self._listen_conn = None
+        self._notify_conn = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        import asyncpg
+
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        self._notify_conn = await asyncpg.connect(self.dsn)
+        await self._listen_conn.add_listener(self.channel, self._on_notify)
+        await super().start()
+
+    async def close(self):
+        await super().close()
+        if self._listen_conn is not None:
+            await self._listen_conn.remove_listener(self.channel, self._on_notify)
+            await self._listen_conn.close()
+            self._listen_conn = None
+        if self._notify_conn is not None:
+            await self._notify_conn.close()
+            self._notify_conn = None
+
+    async def _send(self, message: bytes):
+        if len(message) > self.MAX_PAYLOAD:
+            # Too large for NOTIFY: keep it on this worker rather than fail the caller
+            self.dropped += 1
+            logger.warning("Event of %d bytes exceeds the NOTIFY limit; delivered locally only", len(message))
+            await self._dispatch(message)
+            return
+        async with self._lock:
+            await self._notify_conn.execute("SELECT pg_notify($1, $2)", self.channel, message.decode())
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        self._dispatch_soon(payload.encode())
+
+
+class LocalSocketBus(EventBus):
+    """Workers on one host exchange datagrams over Unix sockets in a shared directory"""
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self._sock: Optional[socket.socket] = None
+
+    async def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        self._sock.bind(self.path)
+        asyncio.get_running_loop().add_reader(self._sock.fileno(), self._on_readable)
+        await super().start()
+
+    async def close(self):
+        await super().close()
+        if self._sock is not None:
+            asyncio.get_running_loop().remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _send(self, message: bytes):
+        for peer in glob.glob(os.path.join(self.directory, "*.sock")):
+            try:
+                self._sock.sendto(message, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The worker behind this socket has exited
+                self._remove_stale(peer)
+            except (BlockingIOError, OSError):
+                self.dropped += 1
+                logger.warning("Dropped event for %s", peer, exc_info=True)
+
+    def _on_readable(self):
+        while True:
+            try:
+                message = self._sock.recv(1 << 20)
+            except BlockingIOError:
+                return
+            self._dispatch_soon(message)
+
+    def _remove_stale(self, peer: str):
+        try:
+            os.unlink(peer)
+        except FileNotFoundError:
+            pass
+
+
+def create_event_bus(backend: str = settings.EVENT_BUS_BACKEND) -> EventBus:
+    """Build the event bus selected by EVENT_BUS_BACKEND"""
+    if backend == "memory":
+        return InProcessBus()
+    if backend == "postgres":
+        url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+        return PostgresNotifyBus(url.render_as_string(hide_password=False), settings.EVENT_BUS_CHANNEL)
+    if backend == "unix":
+        return LocalSocketBus(settings.EVENT_BUS_SOCKET_DIR)
+    raise ValueError(f"Unknown event bus backend: {backend}")
+
+
+event_bus = create_event_bus()
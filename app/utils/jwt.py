@@ -1,6 +1,10 @@
+import time
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
 # SECRET key and algorithm
 SECRET_KEY = "your_secret_key"  # use a secure env variable in production!
 ALGORITHM = "HS256"
@@ -13,9 +17,21 @@ def create_access_token(data: dict, expires_delta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Verified token -> claims; each entry expires with the token's exp
+token_cache: TTLCache[dict] = TTLCache(settings.AUTH_TOKEN_CACHE_SIZE, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def decode_token(token: str) -> dict:
+    """Verify a token and return its claims, skipping the signature check for tokens seen before"""
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if "exp" in payload:
+            token_cache.set(token, payload, ttl=payload["exp"] - time.time())
+    return payload
+
 def verify_token(token: str, credentials_exception):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         user_id: int = payload.get("sub")
         if user_id is None:
             raise credentials_exception
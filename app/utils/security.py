@@ -1,5 +1,13 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(password: str) -> str:
@@ -9,4 +17,92 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash operations are already waiting"""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small thread pool so it never blocks the event loop
+
+    bcrypt releases the GIL while hashing, so threads run in parallel. At
+    most ``max_pending`` operations may be running or queued; beyond that
+    callers get PasswordHasherBusy straight away instead of queueing.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Guards running, which the worker threads update
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_wait = 0.0
+        self._total_queue_wait = 0.0
+        self._total_run_time = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(pwd_context.verify, plain_password, hashed_password)
+
+    def close(self):
+        """Stop the pool; queued operations are cancelled"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_queue_wait": self._total_queue_wait / self.completed if self.completed else 0.0,
+            "max_queue_wait": self.max_queue_wait,
+            "avg_run_time": self._total_run_time / self.completed if self.completed else 0.0,
+        }
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hasher")
+
+        self.pending += 1
+        submitted = time.perf_counter()
+        timings = {}
+
+        def run():
+            timings["started"] = time.perf_counter()
+            with self._lock:
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                timings["finished"] = time.perf_counter()
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, run)
+        finally:
+            self.pending -= 1
+            if "finished" in timings:
+                queue_wait = timings["started"] - submitted
+                self.completed += 1
+                self._total_queue_wait += queue_wait
+                self._total_run_time += timings["finished"] - timings["started"]
+                self.max_queue_wait = max(self.max_queue_wait, queue_wait)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
@@ -1,43 +1,315 @@
-import json
-from typing import Dict, List, Any
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Iterable, List, Optional, Set, Union
+
+import orjson
 from fastapi import WebSocket
 
+from app.core.config import settings
+from app.utils.event_bus import EventBus, event_bus
+
+logger = logging.getLogger(__name__)
+
+# Slow consumer policies
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued message to make room
+DISCONNECT = "disconnect"    # close the socket once its queue is full
+
+
+# Every topic a client can subscribe to:
+#   *                      all events
+#   log:* | attack:* | resource:* | campaign:*
+#                          every event of one type
+#   resource:{id}          logs, attacks and updates for a single resource
+#   attack:{attack_type}   attacks of one type, e.g. attack:heap-overflow
+#   log:level>={level}     logs at or above a level
+#   campaign:{id}          progress of a single attack campaign
+ALL_TOPICS = "*"
+EVENT_TYPES = {"log": "log", "attack": "attack", "resource_update": "resource", "campaign": "campaign"}
+LOG_LEVELS = ["debug", "info", "warning", "error"]
+
+
+def parse_topic(topic: str) -> str:
+    """Validate a subscription topic and return it in canonical form"""
+    topic = topic.strip()
+    if topic == ALL_TOPICS:
+        return topic
+    prefix, _, rest = topic.partition(":")
+    if prefix not in EVENT_TYPES.values() or not rest:
+        raise ValueError(f"Unknown topic: {topic}")
+    if prefix == "log" and rest.startswith("level>="):
+        level = rest[len("level>="):].lower()
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level in topic: {topic}")
+        return f"log:level>={level}"
+    if prefix in ("resource", "campaign") and rest != "*" and not rest.isdigit():
+        raise ValueError(f"Invalid {prefix} id in topic: {topic}")
+    return f"{prefix}:{rest}"
+
+
+def event_topics(event_type: str, payload: Dict[str, Any]) -> List[str]:
+    """All topics an event is published under"""
+    prefix = EVENT_TYPES[event_type]
+    topics = [ALL_TOPICS, f"{prefix}:*"]
+
+    if event_type == "campaign":
+        topics.append(f"campaign:{payload['id']}")
+        return topics
+
+    resource_id = payload.get("id") if event_type == "resource_update" else payload.get("resourceId")
+    if resource_id is not None:
+        topics.append(f"resource:{resource_id}")
+
+    if event_type == "attack" and payload.get("attackType"):
+        topics.append(f"attack:{getattr(payload['attackType'], 'value', payload['attackType'])}")
+    elif event_type == "log" and payload.get("level") in LOG_LEVELS:
+        # A warning matches level>=debug, level>=info and level>=warning
+        for level in LOG_LEVELS[:LOG_LEVELS.index(payload["level"]) + 1]:
+            topics.append(f"log:level>={level}")
+    return topics
+
+
+class Frame:
+    """A message encoded once and shared by every recipient"""
+
+    __slots__ = ("data", "_text")
+
+    def __init__(self, data: bytes, text: Optional[str] = None):
+        self.data = data
+        self._text = text
+
+    @property
+    def text(self) -> str:
+        # Decoded at most once, the first time a text-mode client needs it
+        if self._text is None:
+            self._text = self.data.decode()
+        return self._text
+
+
+def encode(data: Any) -> bytes:
+    """Serialize a payload with orjson; datetimes and enums are handled natively"""
+    return orjson.dumps(data, default=str)
+
+
+class ClientConnection:
+    """A connected socket with its own bounded send queue and writer task"""
+
+    def __init__(self, websocket: WebSocket, max_queue_size: int, binary: bool = False):
+        self.websocket = websocket
+        # Binary clients get the encoded bytes as-is instead of a text frame
+        self.binary = binary
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.topics: Set[str] = set()
+        # Until the client subscribes explicitly it receives every event
+        self.default_subscription = True
+
+
+# Event bus channel carrying WebSocket broadcasts between workers
+BUS_CHANNEL = "ws"
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(
+            self,
+            max_queue_size: int = 256,
+            slow_consumer_policy: str = DROP_OLDEST,
+            bus: Optional[EventBus] = None,
+    ):
+        if slow_consumer_policy not in (DROP_OLDEST, DISCONNECT):
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.max_queue_size = max_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        # topic -> clients subscribed to it
+        self.subscriptions: Dict[str, Set[ClientConnection]] = {}
+        # Closes of slow consumers still in flight
+        self._close_tasks: Set[asyncio.Task] = set()
+        # Events published on the bus come back to every worker's hub, this one included
+        self.bus = bus
+        if bus is not None:
+            bus.subscribe(BUS_CHANNEL, self._deliver)
+
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.slow_disconnects = 0
+        self.send_errors = 0
+        self.max_send_latency = 0.0
+        self._total_send_latency = 0.0
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, binary: bool = False):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = ClientConnection(websocket, self.max_queue_size, binary)
+        client.task = asyncio.create_task(self._writer(client))
+        self.active_connections[websocket] = client
+        self._add_topics(client, [ALL_TOPICS])
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        self._remove_topics(client, list(client.topics))
+        if client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Subscribe a client to topics; returns its full topic list"""
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return []
+        parsed = [parse_topic(topic) for topic in topics]
+        if client.default_subscription:
+            client.default_subscription = False
+            self._remove_topics(client, [ALL_TOPICS])
+        self._add_topics(client, parsed)
+        return sorted(client.topics)
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Unsubscribe a client from topics; returns its remaining topic list"""
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return []
+        parsed = [parse_topic(topic) for topic in topics]
+        client.default_subscription = False
+        self._remove_topics(client, parsed)
+        return sorted(client.topics)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+    async def send_personal_message(self, message: Union[str, bytes], websocket: WebSocket):
+        client = self.active_connections.get(websocket)
+        if client:
+            self._enqueue(client, self._to_frame(message))
 
-    async def broadcast_json(self, data: Dict[str, Any]):
-        json_data = json.dumps(data)
-        await self.broadcast(json_data)
+    async def broadcast(self, message: Union[str, bytes, Frame], topics: Optional[List[str]] = None):
+        """Queue a message for every client subscribed to any of the topics
+
+        Without topics the message goes to every connection.
+        """
+        # Only queues the message; every client's writer task sends it on its own
+        frame = self._to_frame(message)
+        if topics is None:
+            recipients = self.active_connections.values()
+        else:
+            recipients = set()
+            for topic in topics:
+                recipients.update(self.subscriptions.get(topic, ()))
+        for client in list(recipients):
+            self._enqueue(client, frame)
+
+    async def broadcast_json(self, data: Dict[str, Any], topics: Optional[List[str]] = None):
+        if self.bus is None:
+            await self.broadcast(Frame(encode(data)), topics)
+            return
+        await self.bus.publish(BUS_CHANNEL, encode(data), topics)
+
+    async def broadcast_event(self, event_type: str, payload: Dict[str, Any]):
+        await self.broadcast_json(
+            {"type": event_type, "payload": payload},
+            event_topics(event_type, payload),
+        )
 
     async def broadcast_log(self, log: Dict[str, Any]):
-        await self.broadcast_json({
-            "type": "log",
-            "payload": log
-        })
+        await self.broadcast_event("log", log)
 
     async def broadcast_attack(self, attack: Dict[str, Any]):
-        await self.broadcast_json({
-            "type": "attack",
-            "payload": attack
-        })
+        await self.broadcast_event("attack", attack)
 
     async def broadcast_resource_update(self, resource: Dict[str, Any]):
-        await self.broadcast_json({
-            "type": "resource_update",
-            "payload": resource
-        })
+        await self.broadcast_event("resource_update", resource)
+
+    async def broadcast_campaign(self, campaign: Dict[str, Any]):
+        await self.broadcast_event("campaign", campaign)
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection, drop and send latency counters"""
+        return {
+            "connections": len(self.active_connections),
+            "topics": len(self.subscriptions),
+            "queued_messages": sum(c.queue.qsize() for c in self.active_connections.values()),
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "messages_sent": self.messages_sent,
+            "messages_dropped": self.messages_dropped,
+            "slow_disconnects": self.slow_disconnects,
+            "send_errors": self.send_errors,
+            "max_send_latency_ms": self.max_send_latency * 1000,
+            "avg_send_latency_ms": (
+                self._total_send_latency / self.messages_sent * 1000 if self.messages_sent else 0.0
+            ),
+        }
+
+    async def _deliver(self, topics: Optional[List[str]], data: bytes):
+        await self.broadcast(Frame(data), topics)
+
+    def _add_topics(self, client: ClientConnection, topics: List[str]):
+        for topic in topics:
+            client.topics.add(topic)
+            self.subscriptions.setdefault(topic, set()).add(client)
+
+    def _remove_topics(self, client: ClientConnection, topics: List[str]):
+        for topic in topics:
+            client.topics.discard(topic)
+            subscribers = self.subscriptions.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self.subscriptions[topic]
+
+    def _to_frame(self, message: Union[str, bytes, Frame]) -> Frame:
+        if isinstance(message, Frame):
+            return message
+        if isinstance(message, str):
+            return Frame(message.encode(), message)
+        return Frame(message)
+
+    def _enqueue(self, client: ClientConnection, frame: Frame):
+        try:
+            client.queue.put_nowait(frame)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.slow_consumer_policy == DISCONNECT:
+            self.slow_disconnects += 1
+            self.messages_dropped += client.queue.qsize() + 1
+            self.disconnect(client.websocket)
+            task = asyncio.create_task(self._close(client.websocket))
+            self._close_tasks.add(task)
+            task.add_done_callback(self._close_tasks.discard)
+            return
+
+        # Keep the newest state: drop the oldest pending message
+        client.queue.get_nowait()
+        client.queue.put_nowait(frame)
+        self.messages_dropped += 1
+
+    async def _writer(self, client: ClientConnection):
+        while True:
+            frame = await client.queue.get()
+            started = time.perf_counter()
+            try:
+                if client.binary:
+                    await client.websocket.send_bytes(frame.data)
+                else:
+                    await client.websocket.send_text(frame.text)
+            except Exception:
+                self.send_errors += 1
+                self.disconnect(client.websocket)
+                return
+            latency = time.perf_counter() - started
+            self.messages_sent += 1
+            self._total_send_latency += latency
+            self.max_send_latency = max(self.max_send_latency, latency)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            # 1013: try again later
+            await websocket.close(code=1013)
+        except Exception:
+            logger.debug("Failed to close slow WebSocket consumer", exc_info=True)
+
+
+# Shared by every route so broadcasts reach all sockets connected to this worker
+manager = ConnectionManager(
+    max_queue_size=settings.WS_SEND_QUEUE_SIZE,
+    slow_consumer_policy=settings.WS_SLOW_CONSUMER_POLICY,
+    bus=event_bus,
+)
@@ -0,0 +1,96 @@
+"""Measure how long a worker takes to import the app and to serve its first request
+
+Each run starts fresh interpreters, so nothing is cached between runs
+except the OS file cache. DATABASE_URL must point at a migrated database.
+
+    python scripts/startup_benchmark.py --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = "import time; start = time.perf_counter(); import app.main; print(time.perf_counter() - start)"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> float:
+    """Seconds spent importing app.main in a new interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_request(path: str, timeout: float, verbose: bool) -> float:
+    """Seconds from spawning a uvicorn worker to its first successful response on path"""
+    port = free_port()
+    started = time.perf_counter()
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        stdout=None if verbose else subprocess.DEVNULL,
+        stderr=None if verbose else subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}{path}"
+        while time.perf_counter() - started < timeout:
+            if worker.poll() is not None:
+                raise RuntimeError(f"Worker exited with code {worker.returncode}; rerun with --verbose")
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError(f"No response from {url} within {timeout}s")
+    finally:
+        worker.terminate()
+        worker.wait()
+
+
+def summary(name: str, values):
+    print(
+        f"{name:<16} median {statistics.median(values):7.3f}s"
+        f"  min {min(values):7.3f}s  max {max(values):7.3f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--path", default="/api/resources/resources/?limit=1",
+        help="Request to wait for; the default one also opens the first database connection",
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--verbose", action="store_true", help="Show the worker's own output")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        parser.error("DATABASE_URL is not set")
+
+    imports, first_requests = [], []
+    for run in range(1, args.runs + 1):
+        imports.append(measure_import())
+        first_requests.append(measure_first_request(args.path, args.timeout, args.verbose))
+        print(f"run {run}: import {imports[-1]:.3f}s, first request {first_requests[-1]:.3f}s")
+
+    summary("import", imports)
+    summary("first request", first_requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import tempfile
+from typing import Optional
+
+# Settings are read at import time, so point the app at a scratch database first
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/cloud-processor-tests.db")
+
+import httpx
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.core import database
+from app.models import (  # noqa: F401  registers every table on Base.metadata
+    attack, attack_campaign, cloud_resource, log, resource_metric, resource_metric_rollup, simulation_job, user,
+)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db(tmp_path, monkeypatch):
+    """Session on a fresh SQLite database holding the full schema"""
+    monkeypatch.setattr(database, "DATABASE_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    await database.dispose_engine()
+    async with database.get_engine().begin() as connection:
+        await connection.run_sync(database.Base.metadata.create_all)
+    async with database.new_session() as session:
+        yield session
+    await database.dispose_engine()
+
+
+@pytest.fixture
+async def client(db):
+    """HTTP client for the app, backed by the same database as ``db``"""
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
+
+
+class FakeWebSocket:
+    """Stand-in for a Starlette WebSocket with a scripted peer
+
+    Messages from the peer go through send_from_client(); sends block
+    while ``paused`` is set and raise when ``broken`` is.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.close_code: Optional[int] = None
+        self.broken = False
+        self.paused = False
+        self._resumed = asyncio.Event()
+        self._incoming: asyncio.Queue = asyncio.Queue()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        await self._send(text)
+
+    async def send_bytes(self, data: bytes):
+        await self._send(data)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+        self._incoming.put_nowait(None)
+
+    async def receive_text(self) -> str:
+        message = await self._incoming.get()
+        if isinstance(message, WebSocketDisconnect):
+            raise message
+        if message is None:
+            # What Starlette raises when receiving on a socket the server closed
+            raise RuntimeError('Cannot call "receive" once a close message has been sent.')
+        return message
+
+    def send_from_client(self, text: str):
+        self._incoming.put_nowait(text)
+
+    def disconnect_client(self):
+        self._incoming.put_nowait(WebSocketDisconnect(1000))
+
+    def resume(self):
+        self.paused = False
+        self._resumed.set()
+
+    async def _send(self, message):
+        if self.paused:
+            await self._resumed.wait()
+        if self.broken:
+            self._incoming.put_nowait(None)
+            raise RuntimeError("Unexpected ASGI message 'websocket.send'")
+        self.sent.append(message)
+
+
+@pytest.fixture
+def websocket_factory():
+    return FakeWebSocket
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.cloud_resource import CloudResource
+from app.services.anomaly_service import AnomalyService
+from app.services.metrics_service import MetricsService
+
+
+class RecordingBroadcaster:
+    def __init__(self):
+        self.alerts = []
+
+    async def broadcast_attack(self, attack):
+        self.alerts.append(attack)
+
+
+def sample(resource_id, timestamp, cpu):
+    return {
+        "resource_id": resource_id, "timestamp": timestamp, "cpu_usage": cpu,
+        "memory_usage": 1.0, "memory_total": 8.0, "disk_usage": 10.0, "network_usage": 1.0,
+    }
+
+
+@pytest.fixture
+async def resource_id(db):
+    resource = CloudResource(owner_id=1, name="web-1")
+    db.add(resource)
+    await db.commit()
+    return resource.id
+
+
+@pytest.mark.anyio
+async def test_ongoing_anomaly_alerts_once_with_several_samples_per_tick(db, resource_id):
+    broadcaster = RecordingBroadcaster()
+    scorer = AnomalyService(broadcaster)
+    metrics = MetricsService()
+    start = datetime.utcnow() - timedelta(minutes=30)
+
+    def at(second):
+        return start + timedelta(seconds=second)
+
+    await metrics.ingest(db, [sample(resource_id, at(second), 10.0 + second % 2) for second in range(10)])
+    await scorer.score_tick(db)
+    assert broadcaster.alerts == []
+
+    # Each sample is ten times the last, so every one of them stays anomalous
+    await metrics.ingest(db, [sample(resource_id, at(10), 100.0), sample(resource_id, at(11), 1000.0)])
+    assert await scorer.score_tick(db) == 1
+    await metrics.ingest(db, [sample(resource_id, at(12), 1e4), sample(resource_id, at(13), 1e5)])
+    await scorer.score_tick(db)
+    assert len(broadcaster.alerts) == 1
+
+    # Back to normal, then a new spike in the middle of a tick
+    await metrics.ingest(db, [sample(resource_id, at(second), 1e5) for second in range(14, 44)])
+    await scorer.score_tick(db)
+    await metrics.ingest(db, [sample(resource_id, at(44), 1e7), sample(resource_id, at(45), 1e5)])
+    await scorer.score_tick(db)
+    assert len(broadcaster.alerts) == 2
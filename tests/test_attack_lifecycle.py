@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.enum.attack_type import AttackType
+from app.enum.status_enum import StatusEnum
+from app.models.attack import Attack
+from app.models.cloud_resource import CloudResource
+from app.models.log import Log
+from app.services.attack_lifecycle import TRANSITIONS, AttackLifecycle
+from app.services.resource_cache import ResourceCache
+from app.utils.clock import VirtualClock
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+async def attack(db):
+    db.add(CloudResource(id=1, owner_id=1, name="web-1"))
+    db.add(Attack(id=1, resource_id=1, attack_type=AttackType.format_string, status=StatusEnum.in_progress))
+    await db.commit()
+
+
+@pytest.fixture
+def lifecycle():
+    return AttackLifecycle(VirtualClock(START, seed=1), ResourceCache(16, 60))
+
+
+async def current(db):
+    db.expire_all()
+    attack = (await db.execute(select(Attack))).scalar_one()
+    resource = (await db.execute(select(CloudResource))).scalar_one()
+    return attack, resource
+
+
+@pytest.mark.anyio
+async def test_a_transition_writes_status_flag_and_logs_together(db, attack, lifecycle):
+    cache = lifecycle.cache
+    assert (await cache.get(db, 1)).under_attack is False
+
+    broadcast = await lifecycle.transition(
+        db, 1, StatusEnum.detected, under_attack=True, details="Format string detected",
+        logs=[("error", "Attack detected", "security-monitor")],
+    )
+
+    assert broadcast["status"] == StatusEnum.detected
+    assert broadcast["resourceName"] == "web-1" and broadcast["details"] == "Format string detected"
+    attack_, resource = await current(db)
+    assert attack_.status == StatusEnum.detected and attack_.updated_at == START
+    assert resource.under_attack is True
+    log = (await db.execute(select(Log))).scalar_one()
+    assert (log.message, log.level, log.timestamp) == ("Attack detected", "error", START)
+    # The cached snapshot was dropped, so the next read sees the flag
+    assert (await cache.get(db, 1)).under_attack is True
+
+
+@pytest.mark.anyio
+async def test_disallowed_transitions_change_nothing(db, attack, lifecycle):
+    assert await lifecycle.transition(
+        db, 1, StatusEnum.mitigated, under_attack=False, logs=[("info", "Mitigated", "security-monitor")]
+    ) is None
+
+    attack_, resource = await current(db)
+    assert attack_.status == StatusEnum.in_progress and resource.under_attack is False
+    assert (await db.execute(select(Log))).first() is None
+
+
+@pytest.mark.anyio
+async def test_the_full_path_and_nothing_after_it(db, attack, lifecycle):
+    for target in (StatusEnum.detected, StatusEnum.mitigating, StatusEnum.mitigating, StatusEnum.mitigated):
+        await lifecycle.clock.sleep(10)
+        assert await lifecycle.transition(db, 1, target) is not None
+
+    attack_, _ = await current(db)
+    assert attack_.updated_at == START + timedelta(seconds=40)
+    # Mitigated is final
+    for target in TRANSITIONS:
+        assert await lifecycle.transition(db, 1, target) is None
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import update
+
+from app.models.user import User
+from app.services.user_service import UserService, principal_cache
+from app.utils.cache import SharedTTLCache
+from app.utils.security import get_password_hash
+
+
+@pytest.fixture
+async def users(db):
+    password = get_password_hash("s3cret")
+    db.add_all([
+        User(id=1, email="ada@example.com", first_name="Ada", last_name="Lovelace", password=password),
+        User(id=2, email="alan@example.com", first_name="Alan", last_name="Turing", password=password,
+             is_active=False),
+    ])
+    await db.commit()
+    # Principals cached by earlier tests belong to other databases
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+async def login(client, email, password="s3cret"):
+    return await client.post("/api/users/login", json={"email": email, "password": password})
+
+
+@pytest.mark.anyio
+async def test_deactivated_users_cannot_sign_in(client, users):
+    response = await login(client, "alan@example.com")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+    # A wrong password gets the generic answer whether or not the account is active
+    for email in ("alan@example.com", "ada@example.com", "nobody@example.com"):
+        response = await login(client, email, "guess")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Incorrect username or password"
+
+
+@pytest.mark.anyio
+async def test_deactivation_revokes_cached_principals(client, db, users):
+    token = (await login(client, "ada@example.com")).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    me = await client.get("/api/users/users/me", headers=headers)
+    assert me.status_code == 200 and me.json()["email"] == "ada@example.com"
+
+    await UserService().deactivate_user(db, 1)
+    assert (await client.get("/api/users/users/me", headers=headers)).status_code == 401
+    assert (await client.get("/api/users/users/me")).status_code == 401
+
+
+@pytest.mark.anyio
+async def test_a_principal_loaded_across_a_deactivation_is_not_cached(db, users, monkeypatch):
+    service = UserService(principals=SharedTTLCache(16, 60, "principal-cache"))
+    execute = db.execute
+
+    async def execute_then_deactivate(*args, **kwargs):
+        result = await execute(*args, **kwargs)
+        await execute(update(User).where(User.id == 1).values(is_active=False))
+        await service.principals.invalidate_everywhere([1])
+        return result
+
+    monkeypatch.setattr(db, "execute", execute_then_deactivate)
+    assert (await service.get_principal(db, 1)).is_active
+    monkeypatch.setattr(db, "execute", execute)
+
+    assert (await service.get_principal(db, 1)).is_active is False
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import select
+
+from app.controller.routes import attacks
+from app.enum.attack_type import AttackType
+from app.enum.job_status import JobStatus
+from app.enum.resource_type import ResourceType
+from app.models.attack import Attack
+from app.models.cloud_resource import CloudResource
+from app.models.log import Log
+from app.schemas.campaign import CampaignRequest
+from app.services.campaign_service import CampaignService
+from app.services.simulation_scheduler import SimulationScheduler
+from app.utils.websocket_manager import ConnectionManager
+
+
+@pytest.fixture
+async def resources(db):
+    db.add_all([
+        CloudResource(id=1, owner_id=1, name="web-1", resource_type=ResourceType.VM),
+        CloudResource(id=2, owner_id=1, name="web-2", resource_type=ResourceType.VM),
+        CloudResource(id=3, owner_id=2, name="db-1", resource_type=ResourceType.STORAGE),
+    ])
+    await db.commit()
+
+
+@pytest.fixture
+def service():
+    # No free slots: jobs stay pending
+    return CampaignService(SimulationScheduler(max_concurrency=0), ConnectionManager())
+
+
+@pytest.mark.anyio
+async def test_campaign_creates_one_attack_and_job_per_resource(db, resources, service):
+    progress = await service.create_campaign(db, CampaignRequest(attack_type=AttackType.heap_overflow, owner_id=1))
+    assert progress["total"] == 2 and progress[JobStatus.pending.value] == 2 and not progress["done"]
+
+    attacks_ = (await db.execute(select(Attack).order_by(Attack.id))).scalars().all()
+    assert [attack.resource_id for attack in attacks_] == [1, 2]
+    assert attacks_[0].details == "Simulating heap-overflow attack on web-1"
+    messages = (await db.execute(select(Log.message))).scalars().all()
+    assert messages == ["Attack simulation started: heap-overflow"] * 2
+    assert await service.get_progress(db, progress["id"]) == progress
+
+
+@pytest.mark.anyio
+async def test_bad_selectors(db, resources, service):
+    with pytest.raises(ValueError):
+        await service.create_campaign(db, CampaignRequest(attack_type=AttackType.off_by_one))
+    assert await service.create_campaign(
+        db, CampaignRequest(attack_type=AttackType.off_by_one, resource_ids=[99])
+    ) is None
+
+
+@pytest.mark.anyio
+async def test_single_simulations_describe_the_attack_like_campaigns(client, resources, monkeypatch):
+    messages = []
+
+    async def create_log(**values):
+        messages.append(values["message"])
+
+    async def submit(*args):
+        pass
+
+    monkeypatch.setattr(attacks.log_service, "create_log", create_log)
+    monkeypatch.setattr(attacks.simulation_scheduler, "submit", submit)
+    response = await client.post(
+        "/api/attacks/attacks/simulate", json={"resource_id": 1, "attack_type": "heap-overflow"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["details"] == "Simulating heap-overflow attack on web-1"
+    assert messages == ["Attack simulation started: heap-overflow"]
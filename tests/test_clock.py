@@ -0,0 +1,50 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.utils.clock import Clock, RealClock, VirtualClock, as_naive_utc
+
+START = datetime(2026, 1, 1)
+
+
+async def timeline(clock):
+    """What one simulation sees: timestamps around sleeps and a few process ids"""
+    seen = [clock.now()]
+    for seconds in (30, 5):
+        await clock.sleep(seconds)
+        seen.append(clock.now())
+    return seen, [clock.rng().randint(1000, 9999) for _ in range(3)]
+
+
+def test_clock_is_abstract():
+    with pytest.raises(TypeError):
+        Clock()
+    assert RealClock().rng() is RealClock().rng()
+
+
+@pytest.mark.anyio
+async def test_virtual_time_only_moves_when_sleeping():
+    clock = VirtualClock(START)
+    times, _ = await asyncio.create_task(timeline(clock))
+    assert times == [START, START + timedelta(seconds=30), START + timedelta(seconds=35)]
+
+
+@pytest.mark.anyio
+async def test_timelines_repeat_however_they_are_scheduled():
+    clock = VirtualClock(START, seed=7)
+    sequential = [await asyncio.create_task(timeline(clock)) for _ in range(2)]
+    concurrent = await asyncio.gather(*(timeline(clock) for _ in range(3)))
+
+    assert sequential[0] == sequential[1]
+    assert all(run == sequential[0] for run in concurrent)
+    # Another clock with the same seed replays them
+    assert await asyncio.create_task(timeline(VirtualClock(START, seed=7))) == sequential[0]
+    assert (await asyncio.create_task(timeline(VirtualClock(START, seed=8))))[1] != sequential[0][1]
+
+
+def test_aware_times_become_naive_utc():
+    aware = datetime(2026, 1, 1, 3, tzinfo=timezone(timedelta(hours=3)))
+    assert as_naive_utc(aware) == START
+    assert as_naive_utc(START) == START
+    assert as_naive_utc(None) is None
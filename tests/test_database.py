@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from app.core import database
+from app.core.database import to_async_url
+from app.models.cloud_resource import CloudResource
+from app.models.user import User
+from app.services.user_service import UserService
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgresql://app:secret@db/app", "postgresql+asyncpg://app:secret@db/app"),
+    ("postgres://app:secret@db/app", "postgresql+asyncpg://app:secret@db/app"),
+    ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+    ("postgresql+asyncpg://db/app", "postgresql+asyncpg://db/app"),
+    ("mysql://db/app", "mysql://db/app"),
+])
+def test_sync_urls_get_the_async_driver(url, expected):
+    assert to_async_url(url) == expected
+
+
+@pytest.mark.anyio
+async def test_relationships_survive_commit(db):
+    user = User(email="ada@example.com", first_name="Ada", last_name="Lovelace", password="x")
+    db.add(user)
+    await db.commit()
+    db.add(CloudResource(owner_id=user.id, name="vm-1"))
+    await db.commit()
+
+    loaded = await UserService().get_user(db, user.id)
+    await db.commit()
+
+    # expire_on_commit=False keeps loaded collections usable outside the await
+    assert [resource.name for resource in loaded.resources] == ["vm-1"]
+
+
+@pytest.mark.anyio
+async def test_the_engine_is_created_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DATABASE_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    await database.dispose_engine()
+    assert database._engine is None
+
+    engine = database.get_engine()
+    assert engine.url.drivername == "sqlite+aiosqlite"
+    assert database.get_engine() is engine and database.new_session().bind is engine
+    await database.dispose_engine()
+    assert database._engine is None
+
+
+def test_migrations_build_the_schema_the_models_describe(tmp_path):
+    # What the container runs before starting the app
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=os.path.dirname(os.path.dirname(__file__)), env={**os.environ, "DATABASE_URL": url},
+        check=True, capture_output=True,
+    )
+    engine = create_engine(url)
+    try:
+        assert set(inspect(engine).get_table_names()) >= set(database.Base.metadata.tables)
+    finally:
+        engine.dispose()
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.utils.event_bus import (
+    EventBus, InProcessBus, LocalSocketBus, PostgresNotifyBus, decode_message, encode_message,
+)
+
+
+class Recorder:
+    def __init__(self):
+        self.messages = []
+        self.received = asyncio.Event()
+
+    async def __call__(self, topics, data):
+        self.messages.append((topics, data))
+        self.received.set()
+
+
+def test_messages_round_trip_through_the_wire_format():
+    message = encode_message("ws", b"a\nb", ["log:*", "resource:1"])
+    assert decode_message(message) == ("ws", ["log:*", "resource:1"], b"a\nb")
+    assert decode_message(encode_message("ws", b"x")) == ("ws", None, b"x")
+
+
+def test_a_backend_must_implement_send():
+    with pytest.raises(TypeError):
+        EventBus()
+
+
+@pytest.mark.anyio
+async def test_in_process_bus_delivers_to_subscribers_of_the_channel():
+    bus = InProcessBus()
+    ws, other = Recorder(), Recorder()
+    bus.subscribe("ws", ws)
+    bus.subscribe("other", other)
+    await bus.start()
+
+    await bus.publish("ws", b"hello", ["log:*"])
+
+    assert ws.messages == [(["log:*"], b"hello")]
+    assert other.messages == []
+    assert bus.stats()["received"] == 1
+
+
+@pytest.mark.anyio
+async def test_failing_handler_does_not_stop_the_others():
+    bus = InProcessBus()
+    recorder = Recorder()
+
+    async def broken(topics, data):
+        raise RuntimeError("boom")
+
+    bus.subscribe("ws", broken)
+    bus.subscribe("ws", recorder)
+    await bus.publish("ws", b"still delivered")
+    assert recorder.messages == [(None, b"still delivered")]
+
+
+@pytest.mark.anyio
+async def test_local_socket_bus_round_trip(tmp_path):
+    bus = LocalSocketBus(str(tmp_path))
+    recorder = Recorder()
+    bus.subscribe("ws", recorder)
+    await bus.start()
+    try:
+        await bus.publish("ws", b"over the socket", ["resource:1"])
+        await asyncio.wait_for(recorder.received.wait(), 1)
+    finally:
+        await bus.close()
+
+    assert recorder.messages == [(["resource:1"], b"over the socket")]
+    assert not (tmp_path / bus.path.rsplit("/", 1)[1]).exists()
+
+
+@pytest.mark.anyio
+async def test_oversized_notify_payload_is_delivered_locally_only():
+    # Never connected: an oversized payload must not reach the NOTIFY connection
+    bus = PostgresNotifyBus("postgresql://unused", "events")
+    bus.started = True
+    recorder = Recorder()
+    bus.subscribe("ws", recorder)
+
+    await bus.publish("ws", b"x" * PostgresNotifyBus.MAX_PAYLOAD)
+
+    assert recorder.messages == [(None, b"x" * PostgresNotifyBus.MAX_PAYLOAD)]
+    assert bus.stats()["dropped"] == 1
@@ -0,0 +1,43 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from sqlalchemy import insert
+
+from app.models.log import Log
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+async def logs(db):
+    await db.execute(insert(Log), [
+        {
+            "resource_id": 1, "timestamp": START + timedelta(minutes=index), "level": "info",
+            "message": f"line {index}, with a comma", "process": "nginx", "pid": 1000,
+        }
+        for index in range(5)
+    ])
+    await db.commit()
+
+
+@pytest.mark.anyio
+async def test_ndjson_export_streams_logs_oldest_first(client, logs):
+    response = await client.get("/api/logs/logs/export")
+    assert response.status_code == 200
+    rows = [orjson.loads(line) for line in response.text.splitlines()]
+    assert [row["message"] for row in rows] == [f"line {index}, with a comma" for index in range(5)]
+
+
+@pytest.mark.anyio
+async def test_csv_export_honours_aware_bounds(client, logs):
+    # 01:02 at UTC+1 is 00:02 UTC; 19:04 the day before at UTC-5 is 00:04 UTC
+    response = await client.get("/api/logs/logs/export", params={
+        "format": "csv", "start": "2026-01-01T01:02:00+01:00", "end": "2025-12-31T19:04:00-05:00",
+    })
+    assert response.status_code == 200
+    assert 'filename="logs.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["message"] for row in rows] == ["line 2, with a comma", "line 3, with a comma"]
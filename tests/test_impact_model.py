@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+from app.enum.attack_type import AttackType, attack_type_value
+from app.services.impact_model import NO_IMPACT, ImpactModel, stable_hash
+
+
+def test_stable_hash_is_fixed_across_processes():
+    probe = "from app.services.impact_model import stable_hash; print(stable_hash('web-1'))"
+    values = {
+        int(subprocess.run(
+            [sys.executable, "-c", probe], check=True, capture_output=True, text=True,
+            env={**os.environ, "PYTHONHASHSEED": seed},
+        ).stdout)
+        for seed in ("1", "2")
+    }
+    assert values == {stable_hash("web-1")}
+    assert stable_hash("web-1", "salt") != stable_hash("web-1")
+
+
+def test_attack_type_value_accepts_members_and_strings():
+    assert attack_type_value(AttackType.heap_overflow) == "heap-overflow"
+    assert attack_type_value("heap-overflow") == "heap-overflow"
+
+
+def test_baselines_stay_within_their_ranges():
+    baseline = ImpactModel().baseline("web-1")
+    assert 5.0 <= baseline.cpu_usage < 15.0
+    assert 1.0 <= baseline.memory_usage < 4.0
+    assert 10.0 <= baseline.disk_usage < 30.0
+    assert 50.0 <= baseline.network_usage < 150.0
+
+
+def test_members_and_values_share_one_impact():
+    model = ImpactModel()
+    impact = model.impact(7, AttackType.heap_overflow)
+    assert impact == model.impact(7, "heap-overflow") == ImpactModel().impact(7, "heap-overflow")
+    assert 2.0 <= impact.memory < 5.0 and 15.0 <= impact.cpu < 25.0
+    assert model._cached_impact.cache_info().currsize == 1
+
+
+def test_salt_reshuffles_and_unknown_types_have_no_impact():
+    names = [f"vm-{index}" for index in range(20)]
+    assert [ImpactModel().baseline(name) for name in names] != [ImpactModel("other").baseline(name) for name in names]
+    assert ImpactModel().impact(7, "sql-injection") == NO_IMPACT
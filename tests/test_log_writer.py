@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.log import Log
+from app.services.log_writer import LogWriter
+
+
+def row(message):
+    return {"resource_id": 1, "level": "info", "message": message, "process": "test", "pid": 1000}
+
+
+@pytest.mark.anyio
+async def test_rows_are_batched_and_ids_returned(db):
+    writer = LogWriter(max_batch_size=10, flush_interval=0.01)
+    ids = await asyncio.gather(*(writer.write(row(f"m{index}")) for index in range(25)))
+    await writer.write(row("no wait"), wait=False)
+    await writer.close()
+
+    assert len(set(ids)) == 25
+    assert await db.scalar(select(func.count()).select_from(Log)) == 26
+    assert writer.stats()["flush_count"] < 26
+
+
+@pytest.mark.anyio
+async def test_a_failed_flush_is_retried_once(db, monkeypatch):
+    writer = LogWriter(flush_interval=0.01)
+    insert = writer._insert
+    calls = []
+
+    async def flaky(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise RuntimeError("connection reset")
+        return await insert(batch)
+
+    monkeypatch.setattr(writer, "_insert", flaky)
+    assert await writer.write(row("kept")) is not None
+    await writer.close()
+    assert len(calls) == 2
+    assert writer.stats()["dropped_rows"] == 0
+
+
+@pytest.mark.anyio
+async def test_rows_that_cannot_be_written_are_counted(db, monkeypatch):
+    writer = LogWriter(flush_interval=0.05)
+
+    async def broken(batch):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(writer, "_insert", broken)
+    await writer.write(row("lost"), wait=False)
+    with pytest.raises(RuntimeError):
+        await writer.write(row("waited"))
+    await writer.close()
+    assert writer.stats()["dropped_rows"] == 2
+    assert writer.stats()["failed_flushes"] == 1
+
+
+@pytest.mark.anyio
+async def test_cancelled_flush_releases_waiting_writers(db, monkeypatch):
+    writer = LogWriter(flush_interval=0.01)
+    flushing = asyncio.Event()
+
+    async def stuck(batch):
+        flushing.set()
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(writer, "_insert", stuck)
+    waiting = asyncio.ensure_future(writer.write(row("pending")))
+    await flushing.wait()
+    writer._task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert writer.stats()["dropped_rows"] == 1
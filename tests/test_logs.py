@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.models.cloud_resource import CloudResource
+from app.models.log import Log
+from app.services.log_service import LogService
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+async def logs(db):
+    db.add(CloudResource(id=1, owner_id=1, name="web-1"))
+    # Pairs of logs share a timestamp so the id has to break the tie
+    await db.execute(insert(Log), [
+        {
+            "resource_id": 1, "timestamp": START + timedelta(minutes=index // 2),
+            "level": "error" if index % 3 == 0 else "info", "message": f"m{index}",
+            "process": "sshd" if index % 2 else "nginx", "pid": 1000,
+        }
+        for index in range(10)
+    ])
+    await db.commit()
+
+
+async def walk(db, limit, **filters):
+    service = LogService()
+    seen, cursor = [], None
+    while True:
+        page, cursor = await service.get_logs(db, limit=limit, cursor=cursor, **filters)
+        seen += [log["id"] for log in page]
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.anyio
+async def test_pages_walk_every_log_newest_first(db, logs):
+    assert await walk(db, limit=3) == list(range(10, 0, -1))
+
+
+@pytest.mark.anyio
+async def test_filters_apply_to_every_page(db, logs):
+    assert await walk(db, limit=1, levels=["error"], process="nginx") == [7, 1]
+    window = await walk(db, limit=2, start=START + timedelta(minutes=1), end=START + timedelta(minutes=3))
+    assert window == [6, 5, 4, 3]
+
+
+@pytest.mark.anyio
+async def test_malformed_cursor_is_a_value_error(db, logs):
+    with pytest.raises(ValueError):
+        await LogService().get_logs(db, cursor="not a cursor")
+
+
+@pytest.mark.anyio
+async def test_route_converts_aware_bounds_to_utc(client, logs):
+    # 03:01 at UTC+3 is 00:01 UTC: logs 3 to 10
+    bounds = {"start": "2026-01-01T03:01:00+03:00"}
+    response = await client.get("/api/logs/logs/", params={**bounds, "limit": 2})
+    assert response.status_code == 200
+    assert [log["id"] for log in response.json()] == [10, 9]
+    assert response.headers[NEXT_CURSOR_HEADER]
+
+    response = await client.get("/api/logs/logs/", params={**bounds, "cursor": response.headers[NEXT_CURSOR_HEADER]})
+    assert [log["id"] for log in response.json()] == [8, 7, 6, 5, 4, 3]
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.cloud_resource import CloudResource
+from app.models.resource_metric import ResourceMetric
+from app.models.resource_metric_rollup import ResourceMetricRollup
+from app.services.metrics_service import MetricsService
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+
+@pytest.fixture
+async def resources(db):
+    db.add_all([CloudResource(id=1, owner_id=1, name="a", memory_total=16.0), CloudResource(id=2, owner_id=1, name="b")])
+    await db.commit()
+
+
+def batch(**overrides):
+    columns = {
+        "resource_id": [1, 2, 1],
+        "timestamp": [NOW, NOW, NOW - timedelta(seconds=30)],
+        "cpu_usage": [10.0, 20.0, 99.0],
+        "memory_usage": [4.0, 2.0, 3.0],
+        "memory_total": None,
+        "disk_usage": [1.0, 2.0, 3.0],
+        "network_usage": [0.5, 0.5, 0.5],
+        "anomaly_score": None,
+    }
+    columns.update(overrides)
+    return columns
+
+
+@pytest.mark.anyio
+async def test_batch_stores_samples_and_the_latest_values(db, resources):
+    assert await MetricsService().ingest_batch(db, batch()) == (3, 2)
+
+    assert await db.scalar(select(func.count()).select_from(ResourceMetric)) == 3
+    assert await db.scalar(select(func.count()).select_from(ResourceMetricRollup)) > 0
+    # The newest sample of resource 1 wins, not the last one in the batch
+    latest = dict((await db.execute(select(CloudResource.id, CloudResource.cpu_usage))).all())
+    assert latest == {1: 10.0, 2: 20.0}
+    available = await db.scalar(select(CloudResource.memory_available).where(CloudResource.id == 1))
+    assert available == 12.0
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("overrides, message", [
+    ({"cpu_usage": [10.0, 20.0]}, "cpu_usage has 2 entries"),
+    ({"cpu_usage": [10.0, 120.0, 5.0]}, "cpu_usage"),
+    ({"memory_usage": [4.0, 9.0, 3.0]}, "memory_usage exceeds memory_total"),
+    ({"resource_id": [1, 2, 3]}, "Unknown resource ids: [3]"),
+])
+async def test_invalid_batches_are_rejected_whole(db, resources, overrides, message):
+    with pytest.raises(ValueError, match=message.replace("[", r"\[").replace("]", r"\]")):
+        await MetricsService().ingest_batch(db, batch(**overrides))
+    await db.rollback()
+    assert await db.scalar(select(func.count()).select_from(ResourceMetric)) == 0
+
+
+@pytest.mark.anyio
+async def test_batch_route_answers_422_for_invalid_input(client, resources):
+    response = await client.post("/api/metrics/metrics/batch", json={
+        "resource_id": [1], "cpu_usage": [10.0, 11.0], "memory_usage": [1.0],
+        "disk_usage": [1.0], "network_usage": [1.0],
+    })
+    assert response.status_code == 422
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.services.metrics_service import RAW, RESOLUTIONS, MetricsService
+
+NOW = datetime(2026, 1, 15, 12, 0)
+
+
+@pytest.mark.parametrize("span, resolution, points", [
+    (timedelta(hours=1), "1m", 60),
+    (timedelta(days=1), "1h", 24),
+    (timedelta(days=7), "1h", 168),
+])
+def test_default_step_stays_within_max_points(span, resolution, points):
+    start = NOW - span
+    step = span.total_seconds() / settings.METRICS_MAX_POINTS
+
+    chosen = MetricsService().pick_resolution(start, step, now=NOW)
+
+    assert chosen == resolution
+    assert span // RESOLUTIONS[chosen] == points <= settings.METRICS_MAX_POINTS
+
+
+def test_step_rounds_up_to_next_tier():
+    service = MetricsService()
+    assert service.pick_resolution(NOW, 0, now=NOW) == RAW
+    assert service.pick_resolution(NOW, 61, now=NOW) == "1h"
+    assert service.pick_resolution(NOW, 3600, now=NOW) == "1h"
+    assert service.pick_resolution(NOW, 30 * 86400, now=NOW) == "1d"
+
+
+def test_pruned_tiers_fall_back_to_coarser():
+    start = NOW - timedelta(days=settings.METRICS_1M_RETENTION_DAYS + 1)
+    assert MetricsService().pick_resolution(start, 1, now=NOW) == "1h"
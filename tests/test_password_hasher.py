@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.utils.security import PasswordHasher, PasswordHasherBusy
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=2)
+    yield hasher
+    hasher.close()
+
+
+@pytest.mark.anyio
+async def test_hashes_verify_off_the_event_loop(hasher):
+    hashed = await hasher.hash("s3cret")
+    assert await hasher.verify("s3cret", hashed)
+    assert not await hasher.verify("guess", hashed)
+    assert hasher.stats()["completed"] == 3 and hasher.stats()["pending"] == 0
+
+
+@pytest.mark.anyio
+async def test_callers_beyond_max_pending_are_turned_away(hasher):
+    release = threading.Event()
+    # One operation runs and one queues behind it
+    blocked = [asyncio.ensure_future(hasher._submit(release.wait)) for _ in range(2)]
+    while hasher.stats()["running"] < 1:
+        await asyncio.sleep(0.01)
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("s3cret")
+    assert hasher.stats()["rejected"] == 1 and hasher.stats()["pending"] == 2
+
+    release.set()
+    assert await asyncio.gather(*blocked) == [True, True]
+    assert hasher.stats()["pending"] == 0
+    # Admission reopens once the backlog drains
+    assert await hasher.verify("s3cret", await hasher.hash("s3cret"))
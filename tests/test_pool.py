@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.database import pool_options
+from app.core.pool import InstrumentedPool, PoolMetrics, pool_metrics, session_origin
+
+
+def test_in_memory_sqlite_keeps_its_default_pool():
+    assert pool_options("sqlite+aiosqlite://") == {}
+    assert pool_options("sqlite+aiosqlite:///:memory:") == {}
+    options = pool_options("postgresql+asyncpg://db/app")
+    assert options["poolclass"] is InstrumentedPool
+    assert options["pool_size"] == settings.DB_POOL_SIZE and options["max_overflow"] == settings.DB_MAX_OVERFLOW
+
+
+def test_metrics_track_waits_and_slow_holds(caplog):
+    metrics = PoolMetrics(slow_hold=1.0)
+    metrics.record_wait(0.2, overflow=False)
+    metrics.record_wait(0.4, overflow=True)
+    with caplog.at_level(logging.WARNING, logger="app.core.pool"):
+        metrics.record_hold(0.5, "GET /fast")
+        metrics.record_hold(2.5, "GET /slow")
+
+    stats = metrics.stats()
+    assert stats["size"] is None
+    assert (stats["checkouts"], stats["overflow_connections"]) == (2, 1)
+    assert stats["avg_wait"] == pytest.approx(0.3) and stats["max_wait"] == 0.4
+    assert (stats["slow_holds"], stats["max_hold"]) == (1, 2.5)
+    assert [record.getMessage() for record in caplog.records] == [
+        "Database connection held for 2.50s by GET /slow"
+    ]
+
+
+@pytest.mark.anyio
+async def test_the_pool_reports_overflow_and_holds(tmp_path, monkeypatch):
+    monkeypatch.setattr(pool_metrics, "slow_hold", 0.0)
+    before = pool_metrics.stats()
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'app.db'}", poolclass=InstrumentedPool, pool_size=1, max_overflow=1
+    )
+    try:
+        session_origin.set("GET /test")
+        async with engine.connect() as first, engine.connect() as second:
+            await first.execute(text("select 1"))
+            await second.execute(text("select 1"))
+            stats = pool_metrics.stats()
+            assert stats["checked_out"] == 2 and stats["overflow"] == 1
+    finally:
+        await engine.dispose()
+
+    after = pool_metrics.stats()
+    assert after["checkouts"] - before["checkouts"] == 2
+    assert after["overflow_connections"] - before["overflow_connections"] == 1
+    assert after["slow_holds"] - before["slow_holds"] == 2
@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import update
+
+from app.models.cloud_resource import CloudResource
+from app.services.resource_cache import BUS_CHANNEL, ResourceCache
+from app.utils.cache import TTLCache
+from app.utils.event_bus import InProcessBus
+
+
+class Timer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+async def resource(db):
+    db.add(CloudResource(id=1, owner_id=1, name="web-1"))
+    await db.commit()
+
+
+def test_entries_expire_and_the_least_recently_used_goes_first():
+    timer = Timer()
+    cache = TTLCache(2, ttl=10, timer=timer)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+
+    timer.now = 10
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["expirations"] == 1
+
+
+def test_a_set_loaded_before_an_invalidation_is_skipped():
+    cache = TTLCache(2, ttl=10)
+    generation = cache.generation()
+    cache.invalidate("a")
+    cache.set("a", "stale", generation=generation)
+    assert cache.get("a") is None and cache.stats()["stale_sets"] == 1
+
+    # Other keys and later loads are unaffected
+    cache.set("b", "fresh", generation=generation)
+    cache.set("a", "fresh", generation=cache.generation())
+    assert cache.get("a") == cache.get("b") == "fresh"
+
+
+def test_keys_beyond_max_size_count_as_invalidated():
+    cache = TTLCache(2, ttl=10)
+    generation = cache.generation()
+    for key in "abc":
+        cache.invalidate(key)
+    # "a" is no longer tracked, so the set is skipped to be safe
+    cache.set("a", "maybe stale", generation=generation)
+    assert cache.get("a") is None
+
+
+@pytest.mark.anyio
+async def test_an_invalidation_during_a_load_is_not_lost(db, resource, monkeypatch):
+    bus = InProcessBus()
+    cache = ResourceCache(16, ttl=60, bus=bus)
+    await bus.start()
+    execute = db.execute
+
+    async def execute_then_update(*args, **kwargs):
+        result = await execute(*args, **kwargs)
+        # Another worker flags the resource while the select is in flight
+        await execute(update(CloudResource).values(under_attack=True))
+        await bus.publish(BUS_CHANNEL, b"1")
+        return result
+
+    monkeypatch.setattr(db, "execute", execute_then_update)
+    assert (await cache.get(db, 1)).under_attack is False
+    monkeypatch.setattr(db, "execute", execute)
+
+    assert (await cache.get(db, 1)).under_attack is True
+    assert (await cache.get(db, 1)).under_attack is True
+    assert cache.stats()["stale_sets"] == 1 and cache.stats()["hits"] == 1
+    await bus.close()
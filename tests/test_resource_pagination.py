@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, update
+
+from app.enum.resource_sort import ResourceSort
+from app.enum.sort_order import SortOrder
+from app.models.cloud_resource import CloudResource
+from app.services.resource_service import ResourceService
+
+CPU = [None, 20.0, 5.0, None, 20.0, 50.0, None]
+
+
+async def walk(db, sort, order, limit=2):
+    service = ResourceService()
+    seen, cursor = [], None
+    while True:
+        rows, cursor, _ = await service.get_resources(db, limit=limit, cursor=cursor, sort=sort, order=order)
+        seen += [row.id for row in rows]
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("sort", [ResourceSort.cpu_usage, ResourceSort.created_at])
+@pytest.mark.parametrize("order", [SortOrder.asc, SortOrder.desc])
+async def test_pages_cover_rows_with_null_sort_values(db, sort, order):
+    start = datetime(2026, 1, 1)
+    await db.execute(insert(CloudResource), [
+        {"owner_id": 1, "name": f"r{index}", "cpu_usage": cpu or 0.0, "created_at": start + timedelta(minutes=cpu or 0)}
+        for index, cpu in enumerate(CPU)
+    ])
+    # Inserting None would fall back to the column defaults
+    await db.execute(
+        update(CloudResource)
+        .where(CloudResource.id.in_([index + 1 for index, cpu in enumerate(CPU) if cpu is None]))
+        .values(cpu_usage=None, created_at=None)
+    )
+    await db.commit()
+
+    # Ascending: values by (value, id), then NULLs by id; descending is the exact reverse
+    ids = range(1, len(CPU) + 1)
+    expected = sorted(ids, key=lambda row_id: (CPU[row_id - 1] is None, CPU[row_id - 1] or 0, row_id))
+    if order == SortOrder.desc:
+        expected.reverse()
+
+    assert await walk(db, sort, order) == expected
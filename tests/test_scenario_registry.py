@@ -0,0 +1,64 @@
+import pytest
+
+from app.enum.attack_type import AttackType
+from app.services.scenario_registry import ScenarioRegistry
+
+DEFAULT = """
+details: Unknown attack vector detected
+attack_prelude:
+- {level: warning, message: Prelude, process: monitor}
+attack_epilogue:
+- {level: error, message: "Confirmed: {attack_type}", process: monitor, delay: 5}
+countermeasure:
+- {level: info, message: "Generic fix for {attack_type}", process: monitor}
+"""
+
+
+def write(directory, name, text):
+    (directory / f"{name}.yaml").write_text(text)
+
+
+def test_bundled_scenarios_cover_every_attack_type():
+    registry = ScenarioRegistry.load()
+    assert registry.attack_types() == sorted(attack_type.value for attack_type in AttackType)
+    for attack_type in AttackType:
+        # Members and plain values find the same compiled scenario
+        assert registry.get(attack_type) is registry.get(attack_type.value)
+
+
+def test_steps_wrap_the_type_specific_ones(tmp_path):
+    write(tmp_path, "default", DEFAULT)
+    write(tmp_path, "heap-overflow", """
+details: Heap corrupted
+attack:
+- {level: error, message: Heap metadata corrupted, process: malloc, delay: 2, memory_impact: 1.5}
+""")
+    registry = ScenarioRegistry.load(str(tmp_path))
+
+    scenario = registry.get(AttackType.heap_overflow)
+    assert scenario.details == "Heap corrupted"
+    assert [step.message for step in scenario.attack_steps] == [
+        "Prelude", "Heap metadata corrupted", "Confirmed: heap-overflow",
+    ]
+    assert [step.delay for step in scenario.attack_steps] == [2, 2, 5]
+    assert scenario.attack_steps[1].memory_impact == 1.5
+    assert [step.message for step in scenario.countermeasure_steps] == ["Generic fix for heap-overflow"]
+
+
+def test_unknown_types_get_the_default_scenario_once(tmp_path):
+    write(tmp_path, "default", DEFAULT)
+    registry = ScenarioRegistry.load(str(tmp_path))
+
+    scenario = registry.get("use-after-free")
+    assert scenario.details == "Unknown attack vector detected"
+    assert scenario.attack_steps[-1].message == "Confirmed: use-after-free"
+    assert registry.get("use-after-free") is scenario
+
+
+def test_bad_steps_fail_at_load(tmp_path):
+    write(tmp_path, "off-by-one", "attack:\n- {level: info, message: Missing process}\n")
+    with pytest.raises(ValueError, match="off-by-one"):
+        ScenarioRegistry.load(str(tmp_path))
+    write(tmp_path, "off-by-one", "attack:\n- {level: info, message: m, process: p, colour: red}\n")
+    with pytest.raises(ValueError, match="unknown fields"):
+        ScenarioRegistry.load(str(tmp_path))
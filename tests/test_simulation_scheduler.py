@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.enum.attack_type import AttackType
+from app.enum.job_kind import JobKind
+from app.enum.job_status import JobStatus
+from app.enum.status_enum import StatusEnum
+from app.models.attack import Attack
+from app.models.cloud_resource import CloudResource
+from app.models.simulation_job import SimulationJob
+from app.services.simulation_scheduler import SimulationScheduler
+from app.utils.websocket_manager import ConnectionManager
+
+
+@pytest.fixture
+async def attack(db):
+    db.add(CloudResource(id=1, owner_id=1, name="web-1", under_attack=True))
+    db.add(Attack(id=1, resource_id=1, attack_type=AttackType.heap_overflow, status=StatusEnum.in_progress))
+    await db.commit()
+
+
+@pytest.fixture
+async def scheduler():
+    scheduler = SimulationScheduler(max_concurrency=1, broadcaster=ConnectionManager())
+    # Jobs block until released instead of playing a whole simulation
+    scheduler.release = asyncio.Event()
+    scheduler.executed = []
+
+    async def execute(session, job):
+        scheduler.executed.append(job.id)
+        await scheduler.release.wait()
+
+    scheduler._execute = execute
+    yield scheduler
+    await scheduler.close()
+
+
+async def add_job(db, **values) -> int:
+    values = {"status": JobStatus.pending.value, "attempts": 0, **values}
+    job = SimulationJob(
+        kind=JobKind.attack.value, attack_id=1, resource_id=1,
+        attack_type=AttackType.heap_overflow.value, **values,
+    )
+    db.add(job)
+    await db.commit()
+    return job.id
+
+
+async def job_row(db, job_id) -> SimulationJob:
+    db.expire_all()
+    return await db.get(SimulationJob, job_id)
+
+
+@pytest.mark.anyio
+async def test_a_job_is_claimed_once(db, attack, scheduler):
+    job_id = await add_job(db)
+
+    claimed = await scheduler._claim(db, job_id)
+    assert claimed.status == JobStatus.running.value and claimed.attempts == 1
+    assert await scheduler._claim(db, job_id) is None
+
+
+@pytest.mark.anyio
+async def test_only_a_stale_running_job_is_reclaimed(db, attack, scheduler):
+    now = datetime.utcnow()
+    fresh = await add_job(db, status=JobStatus.running.value, attempts=1, heartbeat_at=now)
+    stale = await add_job(
+        db, status=JobStatus.running.value, attempts=1,
+        heartbeat_at=now - timedelta(seconds=settings.SIMULATION_STALE_AFTER + 1),
+    )
+
+    assert await scheduler._claim(db, fresh) is None
+    reclaimed = await scheduler._claim(db, stale)
+    assert reclaimed.attempts == 2 and reclaimed.heartbeat_at >= now
+
+
+@pytest.mark.anyio
+async def test_maintain_heartbeats_running_jobs(db, attack, scheduler):
+    job = await scheduler.submit(db, JobKind.attack, 1, 1, AttackType.heap_overflow)
+    while not scheduler.executed:
+        await asyncio.sleep(0.01)
+    old = datetime(2026, 1, 1)
+    await db.execute(update(SimulationJob).where(SimulationJob.id == job.id).values(heartbeat_at=old))
+    await db.commit()
+
+    await scheduler.maintain()
+    assert (await job_row(db, job.id)).heartbeat_at > old
+
+    scheduler.release.set()
+    while scheduler.stats()["running"]:
+        await asyncio.sleep(0.01)
+    assert (await job_row(db, job.id)).status == JobStatus.completed.value
+
+
+@pytest.mark.anyio
+async def test_cancelling_stops_the_attack_and_releases_the_resource(db, attack, scheduler):
+    running = (await scheduler.submit(db, JobKind.attack, 1, 1, AttackType.heap_overflow)).id
+    # No free slot: stays pending
+    pending = (await scheduler.submit(db, JobKind.countermeasure, 1, 1, AttackType.heap_overflow)).id
+    while not scheduler.executed:
+        await asyncio.sleep(0.01)
+
+    jobs = await scheduler.cancel_attack_jobs(db, 1)
+    assert {job.id for job in jobs} == {running, pending}
+    while scheduler.stats()["running"]:
+        await asyncio.sleep(0.01)
+
+    assert scheduler.stats()["cancelled"] == 1
+    assert (await job_row(db, running)).status == JobStatus.cancelled.value
+    assert (await job_row(db, pending)).status == JobStatus.cancelled.value
+    attack = (await db.execute(select(Attack))).scalar_one()
+    resource = (await db.execute(select(CloudResource))).scalar_one()
+    assert attack.status == StatusEnum.stopped
+    assert resource.under_attack is False
+
+
+@pytest.mark.anyio
+async def test_a_freed_slot_starts_the_backlog(db, attack, scheduler):
+    first = await scheduler.submit(db, JobKind.attack, 1, 1, AttackType.heap_overflow)
+    second = await scheduler.submit(db, JobKind.attack, 1, 1, AttackType.heap_overflow)
+    while not scheduler.executed:
+        await asyncio.sleep(0.01)
+    assert scheduler.executed == [first.id] and scheduler.stats()["backlog"]
+
+    scheduler.release.set()
+    while len(scheduler.executed) < 2 or scheduler.stats()["running"]:
+        await asyncio.sleep(0.01)
+    assert scheduler.executed == [first.id, second.id]
+    await asyncio.gather(*scheduler._fill_tasks)
+    assert not scheduler._fill_tasks
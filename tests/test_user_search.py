@@ -0,0 +1,50 @@
+import pytest
+
+from app.enum.user_role import UserRole
+from app.models.user import User
+from app.services.user_service import UserService, escape_like
+
+
+@pytest.fixture
+async def users(db):
+    db.add_all([
+        User(id=1, email="regrace@example.com", first_name="Bo", last_name="Lee", password="x"),
+        User(id=2, email="hopper@example.com", first_name="Ann", last_name="Hopper", password="x",
+             role=UserRole.admin),
+        User(id=3, email="ann.g@example.com", first_name="Anne", last_name="Grayson", password="x",
+             is_active=False),
+        User(id=4, email="mr_100%@example.com", first_name="Percy", last_name="Cent", password="x"),
+        User(id=5, email="grace@example.com", first_name="Grace", last_name="Hopper", password="x"),
+    ])
+    await db.commit()
+
+
+async def search(db, query, **filters):
+    return [user.id for user in await UserService().search_users(db, query, **filters)]
+
+
+@pytest.mark.anyio
+async def test_exact_email_then_prefix_then_substring_matches(db, users):
+    assert await search(db, "hopper@example.com") == [2]
+    # "grace" starts Grace's email and first name but sits inside regrace@
+    assert await search(db, "grace") == [5, 1]
+    # Matching ignores case; the exact email still ranks first
+    assert await search(db, "GRACE@example.com") == [5, 1]
+    # Equal ranks fall back to id order
+    assert await search(db, "example.com") == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.anyio
+async def test_every_word_has_to_match(db, users):
+    assert await search(db, "ann hopper") == [2]
+    assert await search(db, "ann") == [2, 3]
+    assert await search(db, "ann", is_active=True) == [2]
+    assert await search(db, "hopper", role=UserRole.admin) == [2]
+
+
+@pytest.mark.anyio
+async def test_wildcards_match_literally_and_pages_follow_the_ranking(db, users):
+    assert escape_like("100%_\\") == "100\\%\\_\\\\"
+    assert await search(db, "r_1") == [4]
+    assert await search(db, "%") == [4]
+    assert await search(db, "", limit=2, offset=1) == [2, 3]
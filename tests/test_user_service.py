@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import inspect
+
+from app.models.cloud_resource import CloudResource
+from app.models.user import User
+from app.services.resource_service import RESPONSE_KEYS, ResourceService
+from app.services.user_service import RESOURCE_COLUMNS, UserService
+
+
+@pytest.fixture
+async def users(db):
+    db.add_all([
+        User(id=1, email="ada@example.com", first_name="Ada", last_name="Lovelace", password="x"),
+        User(id=2, email="alan@example.com", first_name="Alan", last_name="Turing", password="y", is_active=False),
+        CloudResource(id=1, owner_id=1, name="web-1", cpu_usage=50.0),
+        CloudResource(id=2, owner_id=1, name="web-2"),
+    ])
+    await db.commit()
+    # Start from an empty identity map so nothing loaded above leaks into the checks
+    db.expunge_all()
+
+
+@pytest.mark.anyio
+async def test_users_load_only_the_resource_response_columns(db, users):
+    users_ = await UserService().get_users(db)
+
+    assert [len(user.resources) for user in users_] == [2, 0]
+    resource = users_[0].resources[0]
+    loaded = {column.key for column in RESOURCE_COLUMNS}
+    assert loaded.isdisjoint(inspect(resource).unloaded)
+    assert "cpu_usage" in inspect(resource).unloaded
+
+
+@pytest.mark.anyio
+async def test_login_reads_credentials_without_the_user(db, users):
+    service = UserService()
+    assert tuple(await service.get_login_credentials(db, "alan@example.com")) == (2, "y", False)
+    assert await service.get_login_credentials(db, "nobody@example.com") is None
+    user = await service.get_user_by_email(db, "ada@example.com")
+    assert "resources" in inspect(user).unloaded
+
+
+@pytest.mark.anyio
+async def test_resource_lists_return_only_the_response_columns(db, users):
+    rows, cursor, _ = await ResourceService().get_resources(db, limit=10)
+
+    assert [row.id for row in rows] == [1, 2] and cursor is None
+    assert set(rows[0]._mapping) == RESPONSE_KEYS
+
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from app.utils.websocket_manager import DISCONNECT, DROP_OLDEST, ConnectionManager, Frame
+
+
+@pytest.mark.anyio
+async def test_drop_oldest_keeps_the_newest_messages(websocket_factory):
+    hub = ConnectionManager(max_queue_size=2, slow_consumer_policy=DROP_OLDEST)
+    client = websocket_factory()
+    client.paused = True
+    await hub.connect(client)
+    await asyncio.sleep(0)
+
+    # Broadcasting never yields, so the stalled client's queue only fits the last two
+    for index in range(5):
+        await hub.broadcast(f"m{index}")
+    client.resume()
+    await asyncio.sleep(0.01)
+
+    assert client.sent == ["m3", "m4"]
+    assert hub.messages_dropped == 3
+    assert client.close_code is None
+
+
+@pytest.mark.anyio
+async def test_disconnect_policy_closes_the_slow_consumer_only(websocket_factory):
+    hub = ConnectionManager(max_queue_size=1, slow_consumer_policy=DISCONNECT)
+    slow, fast = websocket_factory(), websocket_factory()
+    slow.paused = True
+    await hub.connect(slow)
+    await hub.connect(fast)
+    await asyncio.sleep(0)
+
+    # The slow writer blocks on m0, m1 fills its queue and m2 overflows it
+    for index in range(3):
+        await hub.broadcast(f"m{index}")
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+
+    assert slow.close_code == 1013
+    assert list(hub.active_connections) == [fast]
+    assert fast.sent == ["m0", "m1", "m2"]
+    assert hub.slow_disconnects == 1
+
+
+@pytest.mark.anyio
+async def test_one_frame_serves_text_and_binary_clients(websocket_factory):
+    hub = ConnectionManager()
+    text_client, binary_client = websocket_factory(), websocket_factory()
+    await hub.connect(text_client)
+    await hub.connect(binary_client, binary=True)
+
+    await hub.broadcast_json({"type": "log", "payload": {"message": "hi"}})
+    await asyncio.sleep(0.01)
+
+    assert text_client.sent == ['{"type":"log","payload":{"message":"hi"}}']
+    assert binary_client.sent == [b'{"type":"log","payload":{"message":"hi"}}']
+
+
+def test_frame_decodes_text_once():
+    frame = Frame(b"payload")
+    assert frame.text is frame.text == "payload"
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ConnectionManager(slow_consumer_policy="block")
@@ -0,0 +1,63 @@
+import asyncio
+
+import orjson
+import pytest
+
+from app.controller.routes import websocket as websocket_route
+from app.utils.websocket_manager import DISCONNECT, ConnectionManager
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = ConnectionManager(max_queue_size=1, slow_consumer_policy=DISCONNECT)
+    monkeypatch.setattr(websocket_route, "manager", hub)
+    return hub
+
+
+async def serve(websocket):
+    task = asyncio.ensure_future(websocket_route.websocket_endpoint(websocket))
+    await asyncio.sleep(0)
+    return task
+
+
+@pytest.mark.anyio
+async def test_broadcasts_fan_out_to_every_client(hub, websocket_factory):
+    clients = [websocket_factory(), websocket_factory()]
+    endpoints = [await serve(client) for client in clients]
+
+    await hub.broadcast_json({"type": "log", "payload": {}})
+    await asyncio.sleep(0.01)
+
+    assert [len(client.sent) for client in clients] == [1, 1]
+    for client in clients:
+        client.disconnect_client()
+    await asyncio.gather(*endpoints)
+    assert hub.active_connections == {}
+
+
+@pytest.mark.anyio
+async def test_slow_consumer_closed_by_the_hub_ends_the_endpoint(hub, websocket_factory):
+    client = websocket_factory()
+    client.paused = True
+    endpoint = await serve(client)
+
+    for index in range(3):
+        await hub.broadcast_json({"type": "log", "payload": {"n": index}})
+    await asyncio.wait_for(endpoint, 1)
+
+    assert client.close_code == 1013
+    assert hub.active_connections == {}
+    assert hub.slow_disconnects == 1
+
+
+@pytest.mark.anyio
+async def test_failed_send_ends_the_endpoint(hub, websocket_factory):
+    client = websocket_factory()
+    client.broken = True
+    endpoint = await serve(client)
+
+    client.send_from_client(orjson.dumps({"action": "subscribe", "topics": ["log:*"]}).decode())
+    await asyncio.wait_for(endpoint, 1)
+
+    assert hub.active_connections == {}
+    assert hub.send_errors == 1
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from app.utils.websocket_manager import ConnectionManager, event_topics, parse_topic
+
+
+@pytest.mark.parametrize("topic, canonical", [
+    ("*", "*"),
+    (" resource:12 ", "resource:12"),
+    ("log:level>=WARNING", "log:level>=warning"),
+    ("attack:heap-overflow", "attack:heap-overflow"),
+])
+def test_topics_are_canonicalised(topic, canonical):
+    assert parse_topic(topic) == canonical
+
+
+@pytest.mark.parametrize("topic", ["metrics:1", "resource:abc", "log:level>=loud", "log:"])
+def test_invalid_topics_are_rejected(topic):
+    with pytest.raises(ValueError):
+        parse_topic(topic)
+
+
+def test_log_events_match_every_lower_level():
+    topics = event_topics("log", {"resourceId": "3", "level": "warning"})
+    assert set(topics) == {
+        "*", "log:*", "resource:3", "log:level>=debug", "log:level>=info", "log:level>=warning",
+    }
+
+
+@pytest.mark.anyio
+async def test_clients_only_receive_their_topics(websocket_factory):
+    hub = ConnectionManager()
+    everything, resource_3, errors = websocket_factory(), websocket_factory(), websocket_factory()
+    for client in (everything, resource_3, errors):
+        await hub.connect(client)
+    assert hub.subscribe(resource_3, ["resource:3"]) == ["resource:3"]
+    hub.subscribe(errors, ["log:level>=error"])
+
+    await hub.broadcast_log({"resourceId": "3", "level": "info", "message": "boot"})
+    await hub.broadcast_log({"resourceId": "4", "level": "error", "message": "crash"})
+    await asyncio.sleep(0.01)
+
+    assert len(everything.sent) == 2
+    assert ['"boot"' in message for message in resource_3.sent] == [True]
+    assert ['"crash"' in message for message in errors.sent] == [True]
+
+    hub.disconnect(errors)
+    assert "log:level>=error" not in hub.subscriptions